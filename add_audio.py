@@ -4,26 +4,7 @@ import logging
 import time
 from moviepy.video.io.VideoFileClip import VideoFileClip
 from moviepy.audio.io.AudioFileClip import AudioFileClip
-from moviepy.video.io.ffmpeg_tools import ffmpeg_merge_video_audio
-from dataclasses import dataclass
-from moviepy.audio.AudioClip import concatenate_audioclips
-from moviepy.Clip import Clip
-from moviepy.decorators import audio_video_effect
-from moviepy.Effect import Effect
-
-# Define AudioLoop effect
-@dataclass
-class AudioLoop(Effect):
-    """Loops over an audio clip."""
-    n_loops: int = None
-    duration: float = None
-
-    @audio_video_effect
-    def apply(self, clip: Clip) -> Clip:
-        if self.duration is not None:
-            self.n_loops = int(self.duration / clip.duration) + 1
-            return concatenate_audioclips(self.n_loops * [clip]).with_duration(self.duration)
-        return concatenate_audioclips(self.n_loops * [clip])
+from ffmpeg_mux import mux_looped_audio
 
 # Set up logging
 logging.basicConfig(
@@ -38,7 +19,6 @@ logger = logging.getLogger()
 video_dir = os.path.join(os.path.dirname(__file__), "videos")
 audio_dir = os.path.join(os.path.dirname(__file__), "audio")
 output_dir = os.path.join(os.path.dirname(__file__), "videos_with_audio")
-temp_audio_path = "temp_looped_audio.mp3"
 
 def check_ffmpeg():
     """Verify FFmpeg installation and codec support."""
@@ -123,38 +103,26 @@ def process_video_with_audio(audio_filename, video_filename):
         if video.audio is not None:
             logger.warning("Video already has audio. It will be replaced.")
 
-        # Handle audio duration mismatch
+        # Handle audio duration mismatch: ffmpeg loops the audio input natively
+        # (-stream_loop) and cuts it at the video's duration, so short loop tiles
+        # need no concatenated intermediate file
         if audio.duration < video.duration:
             logger.warning(f"Audio ({audio.duration}s) is shorter than video ({video.duration}s). Looping audio.")
-            looped_audio = audio.with_effects([AudioLoop(duration=video.duration)])
-            logger.info(f"Saving looped audio to {temp_audio_path}")
-            looped_audio.write_audiofile(temp_audio_path, codec="mp3")
-            audio.close()  # Close original audio
-            audio = AudioFileClip(temp_audio_path)  # Load looped audio
-            audio_path = temp_audio_path
-            logger.info(f"Looped audio duration: {audio.duration} seconds")
         elif audio.duration > video.duration:
             logger.warning(f"Audio ({audio.duration}s) is longer than video ({video.duration}s). Trimming audio.")
-            audio = audio.with_duration(video.duration)  # Use with_duration for trimming
-            logger.info(f"Trimmed audio duration: {audio.duration} seconds")
+        video_duration = video.duration
 
-        # Close video clip as not needed for ffmpeg_merge_video_audio
+        # Close clips as they are not needed for the ffmpeg merge
         video.close()
+        audio.close()
 
         # Merge video and audio
         logger.info(f"Merging video ({video_path}) and audio ({audio_path}) into {output_path}")
         try:
-            ffmpeg_merge_video_audio(
-                video_path,
-                audio_path,
-                output_path,
-                video_codec="copy",
-                audio_codec="aac",
-                logger="bar"
-            )
+            mux_looped_audio(video_path, audio_path, output_path, video_duration, audio_codec="aac")
 
         except Exception as e:
-            logger.error(f"ffmpeg_merge_video_audio failed: {e}")
+            logger.error(f"mux_looped_audio failed: {e}")
             raise
 
         # Verify output file
@@ -171,7 +139,7 @@ def process_video_with_audio(audio_filename, video_filename):
             raise RuntimeError(f"Output file {output_path} was not created properly")
 
     except Exception as e:
-        logger.error(f"Error processing video with ffmpeg_merge_video_audio: {e}")
+        logger.error(f"Error processing video with mux_looped_audio: {e}")
         raise
 
     finally:
@@ -181,12 +149,6 @@ def process_video_with_audio(audio_filename, video_filename):
         except NameError:
             pass
 
-        # Clean up temporary files
-        for temp_file in [temp_audio_path]:
-            if os.path.exists(temp_file):
-                logger.info(f"Cleaning up temporary file: {temp_file}")
-                os.remove(temp_file)
-
         # Log total execution time
         end_time = time.time()
         elapsed_time = end_time - start_time
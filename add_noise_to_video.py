@@ -3,11 +3,12 @@ import glob
 import sys
 from moviepy.video.io.VideoFileClip import VideoFileClip
 from moviepy.audio.io.AudioFileClip import AudioFileClip
-from moviepy.audio.AudioClip import CompositeAudioClip
-from moviepy.video.VideoClip import VideoClip
 import time
 import numpy as np
 from scipy.io import wavfile
+from audio_effects import EffectsChain, Gain, Limiter, iter_processed_blocks, process_in_blocks
+from ffmpeg_mux import mux_audio_stream, mux_looped_audio
+from noise import NoiseSpec, noise_blocks
 
 def add_noise_to_video(video_path, audio_path, output_dir="videos_with_audio"):
     print(f"Processing video: {video_path}, audio: {audio_path}")
@@ -23,11 +24,12 @@ def add_noise_to_video(video_path, audio_path, output_dir="videos_with_audio"):
         print(f"Created output directory: {output_dir}")
 
     try:
-        # Load video
+        # Load video (only its properties are needed; the stream is copied as-is)
         print("Loading video...")
         video_clip = VideoFileClip(video_path)
         video_duration = video_clip.duration
         video_fps = video_clip.fps
+        video_clip.close()
         print(f"Loaded video '{video_path}' with duration {video_duration:.2f} seconds, fps {video_fps}")
 
         # Load audio
@@ -51,44 +53,30 @@ def add_noise_to_video(video_path, audio_path, output_dir="videos_with_audio"):
         # Scale volume
         clip_data = audio_clip.to_soundarray()
         max_amplitude = np.max(np.abs(clip_data))
+        chain = EffectsChain()
         if max_amplitude > 0:
-            clip_data = clip_data / max_amplitude
+            chain.append(Gain(1.0 / max_amplitude))
         else:
             print(f"Error: Input audio '{audio_name}' has zero amplitude.")
-        clip_data = clip_data * volume_factor
+        chain.append(Gain(volume_factor))
+        # Hard ceiling (knee=1.0): a signal normalized to peak 1.0 passes through unchanged
+        chain.append(Limiter(ceiling=1.0, knee=1.0))
+        clip_data = process_in_blocks(chain, clip_data)
         audio_clip.close()
 
-        # Save temporary WAV
+        # Save temporary WAV (the same length as the input, e.g. a short loop tile)
         temp_wav = f"temp_scaled_{audio_name}.wav"
         wavfile.write(temp_wav, sample_rate, np.int16(clip_data * 32767))
         print(f"Saved temporary WAV: {temp_wav}")
 
-        # Verify temp WAV
-        audio_clip = AudioFileClip(temp_wav)
-        temp_volume = audio_clip.max_volume()
-        print(f"Temporary WAV max volume: {temp_volume:.4f}")
-
-        # Match audio duration to video
+        # Match audio duration to video: ffmpeg loops the WAV natively, so a
+        # seamless loop tile covers any length without composite clips
         if audio_duration < video_duration:
             num_repeats = int(video_duration / audio_duration) + 1
-            audio_clips = [AudioFileClip(temp_wav) for _ in range(num_repeats)]
-            audio_clip = CompositeAudioClip(audio_clips)
-            print(f"Noise '{audio_path}' repeated {num_repeats} times to cover {video_duration:.2f} seconds")
-            # Verify composite audio duration
-            composite_duration = audio_clip.duration
-            print(f"Composite audio duration: {composite_duration:.2f} seconds")
-            if composite_duration < video_duration:
-                print(f"Warning: Composite audio duration ({composite_duration:.2f}s) is shorter than video ({video_duration:.2f}s)")
+            print(f"Noise '{audio_path}' looped {num_repeats} times to cover {video_duration:.2f} seconds")
         else:
-            audio_clip = audio_clip.set_duration(video_duration)
             print(f"Noise '{audio_path}' trimmed to {video_duration:.2f} seconds")
 
-        # Set audio on video clip using with_audio
-        final_clip = video_clip.with_audio(audio_clip)
-        if final_clip.audio is None:
-            print("Error: Audio was not properly attached to the final clip.")
-            raise ValueError("Audio attachment failed")
-
         # Output file
         video_name = os.path.splitext(os.path.basename(video_path))[0]
         audio_name = os.path.splitext(os.path.basename(audio_path))[0]
@@ -96,18 +84,8 @@ def add_noise_to_video(video_path, audio_path, output_dir="videos_with_audio"):
         output_path = os.path.join(output_dir, output_filename)
         print(f"Writing video to '{output_path}'...")
 
-        # Write video (compatible with older MoviePy versions)
-        final_clip.write_videofile(
-            output_path,
-            fps=video_fps,
-            codec="libx264",
-            audio_codec="aac",
-            audio_bitrate="192k",
-            bitrate="1000k",
-            threads=2,
-            temp_audiofile="temp_audio.wav",
-            remove_temp=True
-        )
+        # Mux: video stream copied, looped noise encoded to AAC
+        mux_looped_audio(video_path, temp_wav, output_path, video_duration, audio_codec="aac", audio_bitrate="192k")
 
         # Verify output file
         if os.path.exists(output_path):
@@ -116,29 +94,80 @@ def add_noise_to_video(video_path, audio_path, output_dir="videos_with_audio"):
             print(f"Error: Output file '{output_path}' was not created.")
 
         # Cleanup
-        video_clip.close()
-        final_clip.close()
-        audio_clip.close()
-        for clip in audio_clips if 'audio_clips' in locals() else []:
-            clip.close()
-        # if os.path.exists(temp_wav):
-        #     os.remove(temp_wav)
+        if os.path.exists(temp_wav):
+            os.remove(temp_wav)
         print(f"Video with noise saved to '{output_path}'")
         return output_path
     except Exception as e:
         print(f"Error processing video or audio for '{audio_path}': {e}")
         if 'video_clip' in locals():
             video_clip.close()
-        if 'final_clip' in locals():
-            final_clip.close()
         if 'audio_clip' in locals():
             audio_clip.close()
-        if 'audio_clips' in locals():
-            for clip in audio_clips:
-                clip.close()
         if 'temp_wav' in locals() and os.path.exists(temp_wav):
             os.remove(temp_wav)
         return None
+def add_generated_noise_to_video(video_path, spec, output_dir="videos_with_audio", sample_rate=44100, workers=1):
+    """
+    Synthesize noise from a NoiseSpec and stream it straight into the muxer.
+
+    Samples are generated block by block and piped to ffmpeg, sized exactly to
+    the video's duration, while the video stream is copied. No WAV is read or
+    written and there is no separate audio pass.
+
+    Args:
+        video_path (str): Path to the input video file.
+        spec (NoiseSpec): Noise color, level and seed.
+        output_dir (str): Directory for output videos (default: 'videos_with_audio').
+        sample_rate (int): Sample rate of the synthesized noise in Hz.
+        workers (int): Worker processes for noise synthesis.
+
+    Returns:
+        str: Path to the created video, or None if an error occurs.
+    """
+    print(f"Processing video: {video_path}, noise: {spec}")
+    if not os.path.exists(video_path):
+        print(f"Error: Video file '{video_path}' not found.")
+        return None
+
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+        print(f"Created output directory: {output_dir}")
+
+    try:
+        # Read the video's duration (the stream itself is copied as-is)
+        video_clip = VideoFileClip(video_path)
+        video_duration = video_clip.duration
+        video_clip.close()
+        print(f"Loaded video '{video_path}' with duration {video_duration:.2f} seconds")
+
+        # Synthesize exactly enough samples to cover the video
+        num_samples = int(np.ceil(video_duration * sample_rate))
+        seed_seq = np.random.SeedSequence(spec.seed)
+        print(f"Synthesizing {spec.color} noise at level {spec.level} (seed: {seed_seq.entropy})")
+        blocks = noise_blocks(spec.color, num_samples, sample_rate, seed_seq, workers)
+        chain = EffectsChain([Gain(spec.level), Limiter(ceiling=1.0, knee=1.0)])
+
+        # Output file, named by color, level and seed so specs never overwrite each other
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        output_filename = f"{video_name}_{spec.label(seed_seq.entropy)}.mp4"
+        output_path = os.path.join(output_dir, output_filename)
+        print(f"Writing video to '{output_path}'...")
+
+        mux_audio_stream(video_path, iter_processed_blocks(chain, blocks), output_path, video_duration,
+                         sample_rate=sample_rate, audio_codec="aac", audio_bitrate="192k")
+
+        if os.path.exists(output_path):
+            print(f"Output file created: {output_path}, size: {os.path.getsize(output_path)} bytes")
+        else:
+            print(f"Error: Output file '{output_path}' was not created.")
+            return None
+        print(f"Video with noise saved to '{output_path}'")
+        return output_path
+    except Exception as e:
+        print(f"Error adding {spec.color} noise to '{video_path}': {e}")
+        return None
+
 def process_all_wavs(video_path, audio_dir="audio", output_dir="videos_with_audio"):
     """
     Process all .wav files in audio_dir, creating a new video for each with the input video.
@@ -190,7 +219,21 @@ if __name__ == "__main__":
         video_filename += '.mp4'
     video_path = os.path.join(video_input_dir, video_filename)
 
-    results = process_all_wavs(video_path, audio_dir, output_dir)
+    # Optional noise specs ('color[:level[:seed]]', e.g. 'brown' or 'pink:0.5:42')
+    # synthesize noise directly instead of using the WAVs in audio_dir
+    try:
+        noise_specs = [NoiseSpec.parse(arg) for arg in sys.argv[2:]]
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if noise_specs:
+        start_time = time.time()
+        results = [add_generated_noise_to_video(video_path, spec, output_dir, workers=os.cpu_count() or 1) for spec in noise_specs]
+        results = [path for path in results if path]
+        minutes, seconds = divmod(int(time.time() - start_time), 60)
+        print(f"\nCompleted processing. Total execution time: {minutes:02d}:{seconds:02d} (minutes:seconds)")
+    else:
+        results = process_all_wavs(video_path, audio_dir, output_dir)
     if results:
         print("Created videos:")
         for path in results:
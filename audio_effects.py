@@ -0,0 +1,231 @@
+import numpy as np
+from scipy import signal as sps
+
+# Default number of samples processed per block (~1.5 s at 44.1 kHz)
+DEFAULT_BLOCK_SIZE = 65536
+
+
+class AudioEffect:
+    """
+    Base class for block-based audio effects.
+
+    Effects receive blocks of samples shaped (n,) for mono or (n, channels),
+    return a block of the same shape, and keep whatever state they need between
+    calls so a long signal can be processed one block at a time.
+    """
+
+    def process(self, block):
+        raise NotImplementedError
+
+    def reset(self):
+        """Clear any state carried between blocks."""
+        pass
+
+
+class Gain(AudioEffect):
+    """Multiply the signal by a constant factor."""
+
+    def __init__(self, factor=1.0):
+        self.factor = factor
+
+    @classmethod
+    def from_db(cls, db):
+        return cls(10 ** (db / 20))
+
+    def process(self, block):
+        return block * np.asarray(self.factor, dtype=block.dtype)
+
+
+class Compressor(AudioEffect):
+    """
+    Dynamic range compressor.
+
+    threshold: Amplitude above which compression starts (0.0 to 1.0)
+    ratio: Compression ratio (e.g., 2.0 means 2:1 compression)
+    smoothing: Time constant in seconds of the level detector. With 0 (default)
+        every sample is compressed on its own amplitude, which matches the old
+        per-sample compressor from generate_white_noise.py.
+    sample_rate: Needed only when smoothing is used.
+    """
+
+    def __init__(self, threshold=0.9, ratio=2.0, smoothing=0.0, sample_rate=44100):
+        self.threshold = threshold
+        self.ratio = ratio
+        self.smoothing = smoothing
+        self.sample_rate = sample_rate
+        self._zi = None
+
+    def reset(self):
+        self._zi = None
+
+    def _detect_level(self, magnitude):
+        if not self.smoothing:
+            return magnitude
+        # One-pole low-pass on |x|; the filter state carries over to the next block
+        coeff = np.exp(-1.0 / (self.smoothing * self.sample_rate))
+        if self._zi is None:
+            self._zi = np.zeros((1,) + magnitude.shape[1:], dtype=magnitude.dtype)
+        b = np.array([1 - coeff], dtype=magnitude.dtype)
+        a = np.array([1, -coeff], dtype=magnitude.dtype)
+        level, self._zi = sps.lfilter(b, a, magnitude, axis=0, zi=self._zi)
+        return level
+
+    def process(self, block):
+        magnitude = np.abs(block)
+        level = self._detect_level(magnitude)
+        over = level > self.threshold
+        if not over.any():
+            return block
+        # Gain that maps the detected level onto the compressed curve
+        safe_level = np.where(over, level, 1.0)
+        gain = np.where(over, (self.threshold + (safe_level - self.threshold) / self.ratio) / safe_level, 1.0)
+        return (block * gain).astype(block.dtype, copy=False)
+
+
+class Limiter(AudioEffect):
+    """
+    Soft-knee peak limiter.
+
+    Samples below `knee * ceiling` pass unchanged; anything above is bent
+    smoothly towards `ceiling` so the output never exceeds it.
+    """
+
+    def __init__(self, ceiling=1.0, knee=0.9):
+        self.ceiling = ceiling
+        self.knee = knee
+
+    def process(self, block):
+        start = self.knee * self.ceiling
+        span = self.ceiling - start
+        magnitude = np.abs(block)
+        if span <= 0:
+            return np.clip(block, -self.ceiling, self.ceiling)
+        if not (magnitude > start).any():
+            return block
+        limited = start + span * np.tanh((magnitude - start) / span)
+        return np.where(magnitude > start, np.sign(block) * limited, block).astype(block.dtype, copy=False)
+
+
+class Fade(AudioEffect):
+    """
+    Linear fade in and/or fade out.
+
+    fade_in / fade_out: Fade lengths in seconds.
+    total_samples: Length of the whole signal; required for the fade out since
+        blocks are processed without knowing where the signal ends.
+    """
+
+    def __init__(self, fade_in=0.0, fade_out=0.0, sample_rate=44100, total_samples=None):
+        self.fade_in_samples = int(fade_in * sample_rate)
+        self.fade_out_samples = int(fade_out * sample_rate)
+        self.total_samples = total_samples
+        self._position = 0
+
+    def reset(self):
+        self._position = 0
+
+    def process(self, block):
+        n = len(block)
+        start = self._position
+        self._position += n
+        # Skip blocks that lie entirely between the fade in and the fade out
+        fade_out_start = None
+        if self.fade_out_samples > 0 and self.total_samples is not None:
+            fade_out_start = self.total_samples - 1 - self.fade_out_samples
+        if start >= self.fade_in_samples and (fade_out_start is None or start + n <= fade_out_start):
+            return block
+        positions = np.arange(start, start + n)
+        gain = np.ones(n)
+        if self.fade_in_samples > 0:
+            gain = np.minimum(gain, positions / self.fade_in_samples)
+        if self.fade_out_samples > 0 and self.total_samples is not None:
+            gain = np.minimum(gain, (self.total_samples - 1 - positions) / self.fade_out_samples)
+        gain = np.clip(gain, 0.0, 1.0)
+        if block.ndim > 1:
+            gain = gain[:, None]
+        return (block * gain).astype(block.dtype, copy=False)
+
+
+class ButterworthFilter(AudioEffect):
+    """
+    Butterworth filter (low-pass, high-pass or band-pass) with filter state
+    carried across blocks so there are no discontinuities at block edges.
+    """
+
+    btype = "lowpass"
+
+    def __init__(self, cutoff, sample_rate=44100, order=2):
+        self.cutoff = cutoff
+        self.sample_rate = sample_rate
+        self.order = order
+        self.sos = sps.butter(order, cutoff, btype=self.btype, fs=sample_rate, output="sos")
+        self._zi = None
+
+    def reset(self):
+        self._zi = None
+
+    def process(self, block):
+        if self._zi is None:
+            self._zi = np.zeros((self.sos.shape[0], 2) + block.shape[1:])
+        filtered, self._zi = sps.sosfilt(self.sos, block, axis=0, zi=self._zi)
+        return filtered.astype(block.dtype, copy=False)
+
+
+class LowPass(ButterworthFilter):
+    """Low-pass filter; `cutoff` in Hz."""
+    btype = "lowpass"
+
+
+class HighPass(ButterworthFilter):
+    """High-pass filter; `cutoff` in Hz. Useful as a DC blocker at a few Hz."""
+    btype = "highpass"
+
+
+class BandPass(ButterworthFilter):
+    """Band-pass filter; `cutoff` is a (low, high) pair in Hz."""
+    btype = "bandpass"
+
+
+class EffectsChain(AudioEffect):
+    """Apply several effects in order, block by block."""
+
+    def __init__(self, effects=None):
+        self.effects = list(effects or [])
+
+    def append(self, effect):
+        self.effects.append(effect)
+        return self
+
+    def process(self, block):
+        for effect in self.effects:
+            block = effect.process(block)
+        return block
+
+    def reset(self):
+        for effect in self.effects:
+            effect.reset()
+
+
+def process_in_blocks(effect, signal, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Run an effect (or chain) over a whole signal one block at a time.
+
+    Args:
+        effect (AudioEffect): Effect or EffectsChain to apply.
+        signal (np.ndarray): Samples shaped (n,) or (n, channels).
+        block_size (int): Number of samples per block.
+
+    Returns:
+        np.ndarray: Processed signal with the same shape and dtype as the input.
+    """
+    output = np.empty_like(signal)
+    for start in range(0, len(signal), block_size):
+        stop = start + block_size
+        output[start:stop] = effect.process(signal[start:stop])
+    return output
+
+
+def iter_processed_blocks(effect, blocks):
+    """Apply an effect to an iterable of blocks, yielding the processed blocks."""
+    for block in blocks:
+        yield effect.process(block)
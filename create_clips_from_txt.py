@@ -1,16 +1,62 @@
 import re
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
-from moviepy.video.VideoClip import VideoClip
 import os
 import psutil
 import time
 import sys
 import datetime
+import argparse
+import hashlib
+import json
+import subprocess
+import threading
+import queue
+from functools import lru_cache
+from leases import LEASE_TIMEOUT, LeaseDirectory, temp_output_path
 
 # Global constant for words per chunk
 WORDS_PER_CHUNK = 1
 
+# Seconds the title frame is shown at the start of each chapter
+TITLE_DURATION = 3
+
+# Frame size the font sizes and text layout are designed for; other sizes scale them proportionally
+REFERENCE_WIDTH = 640
+REFERENCE_HEIGHT = 360
+
+# Text layout: chunks wrap inside this margin and shrink (down to MIN_FONT_SIZE) until they fit
+TEXT_MARGIN = 20
+MIN_FONT_SIZE = 12
+LINE_SPACING = 1.2
+LAYOUT_CACHE_SIZE = 1024  # Layouts kept between chapters and create_text_frame calls (see cached_layout_text)
+
+# Draft/preview renders: small frames, low fps, fastest x264 preset, and only the
+# first DRAFT_MAX_SECONDS of each chapter unless told otherwise
+DRAFT_WIDTH = 320
+DRAFT_HEIGHT = 180
+DRAFT_FPS = 8
+DRAFT_PRESET = "ultrafast"
+DRAFT_MAX_SECONDS = 30
+CONTACT_SHEET_COLUMNS = 4
+CONTACT_SHEET_ROWS = 4
+
+# Render/encode pipeline: memory set aside for queued frame buffers (per chapter
+# encode) and the number of threads rasterizing frames ahead of the encoder
+FRAME_MEMORY_BUDGET_MB = 64
+RENDER_THREADS = 2
+
+# Output ladder: rendition name -> (width, height, video bitrate)
+RENDITIONS = {
+    "360p": (640, 360, "1000k"),
+    "720p": (1280, 720, "2500k"),
+    "1080p": (1920, 1080, "5000k"),
+}
+
+# HLS output: target segment length in seconds and segment container ('mpegts' or 'fmp4')
+HLS_SEGMENT_DURATION = 4
+HLS_SEGMENT_TYPE = "mpegts"
+
 # Function to log run details (assumed implementation)
 def log_run_details(script_name, book_title, runtime):
     """
@@ -142,14 +188,10 @@ def map_chapters_to_chunks(chapter_positions, chunks, words_per_chunk=WORDS_PER_
 def create_title_frame(book_title, author, chapter_title, width=640, height=360, watermark_text="Generated by {user name}"):
     image = Image.new("RGB", (width, height), color=(20, 20, 40))  # Dark blue background
     draw = ImageDraw.Draw(image)
-    try:
-        title_font = ImageFont.truetype("arial.ttf", 40)
-        subtitle_font = ImageFont.truetype("arial.ttf", 30)
-        watermark_font = ImageFont.truetype("arial.ttf", 15)
-    except:
-        title_font = ImageFont.load_default()
-        subtitle_font = ImageFont.load_default()
-        watermark_font = ImageFont.load_default()
+    scale = height / REFERENCE_HEIGHT  # Font sizes are given for 360p
+    title_font = load_font(max(1, round(40 * scale)))
+    subtitle_font = load_font(max(1, round(30 * scale)))
+    watermark_font = load_font(max(1, round(15 * scale)))
 
     # Book title (top, 1/6 height)
     title_bbox = draw.textbbox((0, 0), book_title, font=title_font)
@@ -184,80 +226,797 @@ def create_title_frame(book_title, author, chapter_title, width=640, height=360,
 
 # Step 5: Create a frame with text and watermark
 def create_text_frame(text, width=640, height=360, font_size=30, watermark_text="Generated by {your name here}"):
+    # Ad hoc frames share a small layout cache; book renders pass their own table (see measure_text_layout)
+    return render_text_frame(cached_layout_text(text, font_size), width, height, watermark_text)
+
+# Load a font once per pixel size
+@lru_cache(maxsize=None)
+def load_font(size):
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except OSError:
+        pass
+    try:
+        # Pillow's bundled default font is scalable from 10.1 on, so the layout still fits
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()
+
+# The text frame fonts for a frame height (font sizes are given for 360p)
+def load_fonts(height, font_size=30):
+    scale = height / REFERENCE_HEIGHT
+    return load_font(max(1, round(font_size * scale))), load_font(max(1, round(15 * scale)))
+
+# Greedily break words into lines no wider than max_width; returns [(line, width, bbox height), ...]
+def wrap_words(words, font, max_width):
+    lines = []
+    current = None
+    for word in words:
+        candidate = f"{current} {word}" if current else word
+        bbox = font.getbbox(candidate)
+        if current and bbox[2] - bbox[0] > max_width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    measured = []
+    for line in lines:
+        bbox = font.getbbox(line)
+        measured.append((line, bbox[2] - bbox[0], bbox[3] - bbox[1]))
+    return measured
+
+# Lay out one chunk at the reference size
+def layout_text(text, font_size=30):
+    """
+    Wrap a chunk into centered lines, auto-fitting the font size: it shrinks in
+    steps of 2 (down to MIN_FONT_SIZE) until every line fits between the
+    margins and the block fits vertically. A single line is centered on its own
+    bounding box, exactly as an unwrapped chunk always was.
+
+    Returns:
+        tuple: (font_size, ((line, line_width, y), ...)), with widths and y
+            positions in REFERENCE_WIDTH x REFERENCE_HEIGHT coordinates
+    """
+    words = text.split()
+    if not words:
+        return font_size, ()
+    max_width = REFERENCE_WIDTH - 2 * TEXT_MARGIN
+    max_height = REFERENCE_HEIGHT - 2 * TEXT_MARGIN
+    sizes = list(range(font_size, MIN_FONT_SIZE, -2)) + [min(font_size, MIN_FONT_SIZE)]
+    for size in sizes:
+        main_font, _ = load_fonts(REFERENCE_HEIGHT, size)
+        lines = wrap_words(words, main_font, max_width)
+        line_bbox = main_font.getbbox("Ag")
+        line_height = round((line_bbox[3] - line_bbox[1]) * LINE_SPACING)
+        if all(line_width <= max_width for _, line_width, _ in lines) and len(lines) * line_height <= max_height:
+            break
+    if len(lines) == 1:
+        line, line_width, text_height = lines[0]
+        return size, ((line, line_width, (REFERENCE_HEIGHT - text_height) // 2),)
+    top = (REFERENCE_HEIGHT - len(lines) * line_height) // 2
+    return size, tuple((line, line_width, top + i * line_height) for i, (line, line_width, _) in enumerate(lines))
+
+# Bounded cache of layouts shared by the layout passes and create_text_frame, so a
+# long-lived process does not grow with every book
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def cached_layout_text(text, font_size=30):
+    return layout_text(text, font_size)
+
+# Layout pass: lay out each unique text of a chapter once, before rendering
+def measure_text_layout(texts, font_size=30):
+    """
+    Returns:
+        dict: text -> layout_text() entry (font size, lines with widths and positions)
+    """
+    layout = {}
+    for text in texts:
+        if text not in layout:
+            layout[text] = cached_layout_text(text, font_size)
+    wrapped = sum(1 for _, lines in layout.values() if len(lines) > 1)
+    shrunk = sum(1 for size, _ in layout.values() if size < font_size)
+    print(f"Laid out {len(layout)} unique chunks ({wrapped} wrapped, {shrunk} with a smaller font)")
+    return layout
+
+@lru_cache(maxsize=None)
+def watermark_position(width, height, watermark_text):
+    _, watermark_font = load_fonts(height)
+    bbox = ImageDraw.Draw(Image.new("RGB", (1, 1))).textbbox((0, 0), watermark_text, font=watermark_font)
+    return (width - (bbox[2] - bbox[0]) - 10, height - (bbox[3] - bbox[1]) - 10)
+
+# Draw a text frame from a layout_text() entry, scaling the reference positions
+def render_text_frame(layout_entry, width=640, height=360, watermark_text="Generated by {your name here}"):
     image = Image.new("RGB", (width, height), color="black")
     draw = ImageDraw.Draw(image)
+    font_size, lines = layout_entry
+    main_font, watermark_font = load_fonts(height, font_size)
+    scale = height / REFERENCE_HEIGHT
+    for line, line_width, y in lines:
+        draw.text(((width - round(line_width * scale)) // 2, round(y * scale)), line, fill="white", font=main_font)
+    draw.text(watermark_position(width, height, watermark_text), watermark_text, fill=(128, 128, 128), font=watermark_font)
+    return np.array(image)
+
+# Start an ffmpeg process that reads raw RGB frames from stdin
+def open_ffmpeg_writer(output_args, width, height, fps):
+    cmd = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(fps),
+        "-i", "pipe:0",
+    ] + output_args
+    return subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+# How many frame buffers fit in the memory budget (at least one per render thread, plus one)
+def frame_queue_depth(width, height, memory_budget_mb=FRAME_MEMORY_BUDGET_MB, render_threads=RENDER_THREADS):
+    frame_bytes = width * height * 3
+    return max(render_threads + 1, int(memory_budget_mb * 1024 * 1024) // frame_bytes)
+
+# Write frames to an ffmpeg process while render threads work ahead of it
+def write_frames_pipelined(process, runs, render, width, height, queue_depth, render_threads=RENDER_THREADS, on_write=None):
+    """
+    Overlap frame rasterization with encoding.
+
+    Render threads take the next run, rasterize its frame into a free buffer
+    from a pool of `queue_depth` preallocated buffers, and hand it over; this
+    (encoder) thread writes the buffers to ffmpeg in order, once per frame of
+    the run, and returns each buffer to the pool. Peak memory is the pool,
+    however far rendering gets ahead. A thread takes a buffer before it takes
+    a run, so the oldest outstanding run always has one and the pool cannot
+    deadlock.
+
+    Args:
+        runs (list): (key, frame_count) pairs in output order.
+        render (callable): render(key) -> (height, width, 3) uint8 frame.
+        queue_depth (int): Number of preallocated frame buffers.
+        on_write (callable): Optional on_write(key), called after each run is written.
+
+    Returns:
+        int: Number of frames written.
+    """
+    free_buffers = queue.Queue()
+    for _ in range(queue_depth):
+        free_buffers.put(np.empty((height, width, 3), dtype=np.uint8))
+    ready = {}
+    errors = []
+    state = {"next_run": 0, "stopped": False}
+    condition = threading.Condition()
+
+    def render_worker():
+        while True:
+            buffer = free_buffers.get()
+            if buffer is None:
+                return
+            with condition:
+                run_index = state["next_run"]
+                if run_index >= len(runs) or state["stopped"]:
+                    free_buffers.put(buffer)
+                    return
+                state["next_run"] += 1
+            try:
+                np.copyto(buffer, render(runs[run_index][0]))
+            except Exception as e:
+                with condition:
+                    errors.append(e)
+                    condition.notify_all()
+                return
+            with condition:
+                ready[run_index] = buffer
+                condition.notify_all()
+
+    threads = [threading.Thread(target=render_worker, daemon=True) for _ in range(render_threads)]
+    for thread in threads:
+        thread.start()
+    frames_written = 0
     try:
-        main_font = ImageFont.truetype("arial.ttf", font_size)
-        watermark_font = ImageFont.truetype("arial.ttf", 15)
-    except:
-        main_font = ImageFont.load_default()
-        watermark_font = ImageFont.load_default()
-
-    text_bbox = draw.textbbox((0, 0), text, font=main_font)
-    text_width = text_bbox[2] - text_bbox[0]
-    text_height = text_bbox[3] - text_bbox[1]
-    text_position = ((width - text_width) // 2, (height - text_height) // 2)
-    draw.text(text_position, text, fill="white", font=main_font)
+        for run_index, (key, count) in enumerate(runs):
+            with condition:
+                while run_index not in ready and not errors:
+                    condition.wait()
+                if errors:
+                    raise errors[0]
+                buffer = ready.pop(run_index)
+            for _ in range(count):
+                process.stdin.write(buffer)
+            frames_written += count
+            free_buffers.put(buffer)
+            if on_write:
+                on_write(key)
+    finally:
+        with condition:
+            state["stopped"] = True
+        for _ in threads:
+            free_buffers.put(None)
+        for thread in threads:
+            thread.join()
+    return frames_written
 
-    watermark_bbox = draw.textbbox((0, 0), watermark_text, font=watermark_font)
-    watermark_width = watermark_bbox[2] - watermark_bbox[0]
-    watermark_height = watermark_bbox[3] - watermark_bbox[1]
-    watermark_position = (width - watermark_width - 10, height - watermark_height - 10)
-    draw.text(watermark_position, watermark_text, fill=(128, 128, 128), font=watermark_font)
-    
-    return np.array(image)
+# Step 6: Work out which chunks a chapter shows and for how long
+def chapter_timeline(chunks, chapter_index, next_chapter_index, wpm=450, chunk_stride=1, max_seconds=None,
+                     words_per_chunk=WORDS_PER_CHUNK):
+    """
+    Returns:
+        tuple: (chunk indices shown as a range, seconds per chunk, total duration in seconds)
+    """
+    duration_per_chunk = (60 / wpm) * words_per_chunk
+    chapter_end = next_chapter_index if next_chapter_index is not None else len(chunks)
+    chapter_chunks = range(chapter_index, min(chapter_end, len(chunks)), max(1, chunk_stride))
+    total_duration = TITLE_DURATION + len(chapter_chunks) * duration_per_chunk
+    if max_seconds:
+        total_duration = min(total_duration, max_seconds)
+        shown = int(np.ceil(max(0, total_duration - TITLE_DURATION) / duration_per_chunk))
+        chapter_chunks = chapter_chunks[:shown]
+    return chapter_chunks, duration_per_chunk, total_duration
+
+# Which frame of the chapter is shown at time t: 'title', a chunk offset, or None (blank)
+def frame_key(t, num_chunks, duration_per_chunk):
+    if t < TITLE_DURATION:
+        return "title"
+    chunk_offset = int((t - TITLE_DURATION) / duration_per_chunk)
+    return chunk_offset if chunk_offset < num_chunks else None
+
+# Build the frame function for a single chapter
+def chapter_frame_function(book_title, author, chunks, chapter_index, next_chapter_index, chapter_title, chapter_num, wpm=450, progress=None,
+                           width=640, height=360, chunk_stride=1, max_seconds=None, layout=None, words_per_chunk=WORDS_PER_CHUNK):
+    """
+    Build the make_frame(t) function and duration for a chapter.
+
+    Consecutive frames showing the same chunk reuse the last rendered frame
+    instead of rasterizing it again. If given, progress(chunks_done, num_chunks)
+    is called each time a new chunk is rendered.
 
-# Step 6: Create a video clip for a single chapter
-def create_chapter_video(book_title, author, chunks, chapter_index, next_chapter_index, chapter_title, chapter_num, output_path, fps=24, wpm=450):
-    title_duration = 3  # Title frame duration
-    duration_per_chunk = (60 / wpm) * WORDS_PER_CHUNK
-    num_chunks = next_chapter_index - chapter_index if next_chapter_index is not None else len(chunks) - chapter_index
-    total_duration = title_duration + num_chunks * duration_per_chunk
+    For drafts, chunk_stride shows only every K-th chunk of the chapter and
+    max_seconds cuts the chapter after that many seconds. `layout` is a
+    measure_text_layout() table; by default one is built for just the chunks
+    the timeline schedules (see chapter_frame_renderer).
+
+    Returns:
+        tuple: (make_frame, total_duration, num_chunks)
+    """
+    chapter_chunks, duration_per_chunk, total_duration = chapter_timeline(
+        chunks, chapter_index, next_chapter_index, wpm, chunk_stride, max_seconds, words_per_chunk)
+    num_chunks = len(chapter_chunks)
+    render = chapter_frame_renderer(book_title, author, chunks, chapter_chunks, chapter_title, chapter_num, width, height, layout)
+    last_frame = {"key": None, "frame": None}
 
     def make_frame(t):
-        if t < title_duration:
-            return create_title_frame(book_title, author, chapter_title)
-        adjusted_t = t - title_duration
-        chunk_offset = int(adjusted_t / duration_per_chunk)
-        if chunk_offset >= num_chunks:
-            return create_text_frame("")  # Blank frame at end
-        chunk_idx = chapter_index + chunk_offset
-        if chunk_idx >= len(chunks):
-            return create_text_frame("")
+        key = frame_key(t, num_chunks, duration_per_chunk)
+        if key != last_frame["key"] or last_frame["frame"] is None:
+            last_frame["key"] = key
+            last_frame["frame"] = render(key)
+            if progress and key not in ("title", None):
+                progress(key + 1, num_chunks)
+        return last_frame["frame"]
+
+    return make_frame, total_duration, num_chunks
+
+# Rasterize a chapter frame by key ('title', a chunk offset, or None for blank).
+# Text comes from `layout` (a measure_text_layout() table), by default laid out for the scheduled chunks only.
+def chapter_frame_renderer(book_title, author, chunks, chapter_chunks, chapter_title, chapter_num, width=640, height=360, layout=None):
+    if layout is None:
+        layout = measure_text_layout([""] + [chunks[i] for i in chapter_chunks])
+
+    def text_frame(text):
+        return render_text_frame(layout[text], width, height)
+
+    def render(key):
+        if key == "title":
+            return create_title_frame(book_title, author, chapter_title, width, height)
+        if key is None:
+            return text_frame("")  # Blank frame at end
+        chunk_idx = chapter_chunks[key]
         if chunk_idx % 1000 == 0:
             print(f"Processing chunk {chunk_idx}/{len(chunks)} for chapter {chapter_num} - Memory: {psutil.Process().memory_info().rss / 1024 / 1024:.2f} MB")
-        return create_text_frame(chunks[chunk_idx])
+        return text_frame(chunks[chunk_idx])
+    return render
+
+# Group a chapter's frames into runs of identical frames: [(key, frame_count), ...]
+def frame_runs(total_duration, fps, num_chunks, duration_per_chunk):
+    runs = []
+    for i in range(int(round(total_duration * fps))):
+        key = frame_key(i / fps, num_chunks, duration_per_chunk)
+        if runs and runs[-1][0] == key:
+            runs[-1][1] += 1
+        else:
+            runs.append([key, 1])
+    return runs
 
-    print(f"Generating video for chapter {chapter_num}, {num_chunks} chunks, duration {total_duration:.2f} seconds...")
+# Report chunk progress as the encoder writes each run
+def run_progress(progress, num_chunks):
+    if not progress:
+        return None
+    return lambda key: progress(key + 1, num_chunks) if key not in ("title", None) else None
+
+# Step 7: Create a video clip for a single chapter
+def create_chapter_video(book_title, author, chunks, chapter_index, next_chapter_index, chapter_title, chapter_num, output_path, fps=24, wpm=450, progress=None,
+                         width=640, height=360, preset="medium", chunk_stride=1, max_seconds=None,
+                         memory_budget_mb=FRAME_MEMORY_BUDGET_MB, render_threads=RENDER_THREADS, layout=None,
+                         words_per_chunk=WORDS_PER_CHUNK):
+    """
+    Render a chapter to an MP4, with rasterization overlapped with encoding
+    (see write_frames_pipelined). Frame buffers are bounded by memory_budget_mb.
+
+    Returns:
+        bool: True if the video was written.
+    """
+    chapter_chunks, duration_per_chunk, total_duration = chapter_timeline(
+        chunks, chapter_index, next_chapter_index, wpm, chunk_stride, max_seconds, words_per_chunk)
+    num_chunks = len(chapter_chunks)
+    render = chapter_frame_renderer(book_title, author, chunks, chapter_chunks, chapter_title, chapter_num, width, height, layout)
+    runs = frame_runs(total_duration, fps, num_chunks, duration_per_chunk)
+    queue_depth = frame_queue_depth(width, height, memory_budget_mb, render_threads)
+    output_args = ["-c:v", "libx264", "-preset", preset, "-b:v", "1000k", "-pix_fmt", "yuv420p", output_path]
+
+    print(f"Generating video for chapter {chapter_num}, {num_chunks} chunks, duration {total_duration:.2f} seconds "
+          f"({queue_depth} frame buffers, {render_threads} render threads)...")
+    process = open_ffmpeg_writer(output_args, width, height, fps)
     try:
-        clip = VideoClip(make_frame, duration=total_duration)
-        clip.write_videofile(output_path, codec="libx264", fps=fps, bitrate="1000k", threads=4,
-                            temp_audiofile=f"temp_audio_{chapter_num}.mp3", remove_temp=True)
-        clip.close()
+        write_frames_pipelined(process, runs, render, width, height, queue_depth, render_threads, run_progress(progress, num_chunks))
+        process.stdin.close()
+        if process.wait() != 0:
+            print(f"Error: ffmpeg exited with code {process.returncode} for chapter {chapter_num}")
+            return False
         print(f"Video saved to {output_path}")
         return True
     except Exception as e:
         print(f"Error during video creation for chapter {chapter_num}: {e}")
-        if 'clip' in locals():
-            clip.close()
+        try:
+            process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        process.wait()
+        return False
+
+# Step 8: Stream a chapter as HLS segments while it renders
+def create_chapter_hls(book_title, author, chunks, chapter_index, next_chapter_index, chapter_title, chapter_num, output_dir,
+                       fps=24, wpm=450, width=640, height=360, segment_duration=HLS_SEGMENT_DURATION, segment_type=HLS_SEGMENT_TYPE,
+                       progress=None, preset="medium", chunk_stride=1, max_seconds=None,
+                       memory_budget_mb=FRAME_MEMORY_BUDGET_MB, render_threads=RENDER_THREADS, layout=None,
+                       words_per_chunk=WORDS_PER_CHUNK):
+    """
+    Render a chapter into fixed-length HLS segments, updating the playlist as each one completes.
+
+    Frames are piped straight into ffmpeg's HLS muxer. Keyframes are forced at
+    every segment boundary, segments are written to a temporary name and
+    renamed when complete, and the playlist (an EVENT playlist) is rewritten
+    after each segment, so playback can start after the first segment and an
+    interrupted render still leaves a playable playlist. EXT-X-ENDLIST is
+    added when the chapter finishes.
+
+    Args:
+        output_dir (str): Directory for playlist.m3u8 and its segments.
+        segment_duration (float): Target segment length in seconds.
+        segment_type (str): 'mpegts' (.ts segments) or 'fmp4' (.m4s segments).
+        progress (callable): Optional progress(chunks_done, num_chunks) callback.
+
+    Returns:
+        bool: True if the chapter rendered completely.
+    """
+    chapter_chunks, duration_per_chunk, total_duration = chapter_timeline(
+        chunks, chapter_index, next_chapter_index, wpm, chunk_stride, max_seconds, words_per_chunk)
+    num_chunks = len(chapter_chunks)
+    render = chapter_frame_renderer(book_title, author, chunks, chapter_chunks, chapter_title, chapter_num, width, height, layout)
+    runs = frame_runs(total_duration, fps, num_chunks, duration_per_chunk)
+    queue_depth = frame_queue_depth(width, height, memory_budget_mb, render_threads)
+    os.makedirs(output_dir, exist_ok=True)
+    playlist_path = os.path.join(output_dir, "playlist.m3u8")
+    extension = "m4s" if segment_type == "fmp4" else "ts"
+    output_args = [
+        "-c:v", "libx264", "-preset", preset, "-b:v", "1000k", "-pix_fmt", "yuv420p",
+        "-force_key_frames", f"expr:gte(t,n_forced*{segment_duration})",
+        "-f", "hls",
+        "-hls_time", str(segment_duration),
+        "-hls_playlist_type", "event",
+        "-hls_segment_type", segment_type,
+        "-hls_flags", "independent_segments+temp_file",
+        "-hls_segment_filename", os.path.join(output_dir, f"segment_%05d.{extension}"),
+        playlist_path,
+    ]
+
+    print(f"Streaming HLS for chapter {chapter_num}, {num_chunks} chunks, duration {total_duration:.2f} seconds, to {playlist_path}...")
+    process = open_ffmpeg_writer(output_args, width, height, fps)
+    try:
+        write_frames_pipelined(process, runs, render, width, height, queue_depth, render_threads, run_progress(progress, num_chunks))
+        process.stdin.close()
+        if process.wait() != 0:
+            print(f"Error: ffmpeg exited with code {process.returncode} for chapter {chapter_num}")
+            return False
+        print(f"HLS playlist complete: {playlist_path}")
+        return True
+    except Exception as e:
+        print(f"Error during HLS streaming for chapter {chapter_num}: {e}")
+        # Closing stdin lets ffmpeg finish the segment in progress; the playlist
+        # keeps every completed segment
+        try:
+            process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        process.wait()
+        return False
+
+# Render several resolutions of a chapter from one timeline and layout
+def create_chapter_ladder(book_title, author, chunks, chapter_index, next_chapter_index, chapter_title, chapter_num, output_paths, layout=None,
+                          fps=24, wpm=450, progress=None, preset="medium", chunk_stride=1, max_seconds=None,
+                          memory_budget_mb=FRAME_MEMORY_BUDGET_MB, render_threads=RENDER_THREADS,
+                          words_per_chunk=WORDS_PER_CHUNK):
+    """
+    Encode every requested rendition of a chapter in one pass.
+
+    The chunk timeline is computed once and the text is measured once at the
+    reference size (or taken from `layout`), only for the chunks scheduled;
+    each rendition then draws with its own font size and runs its own ffmpeg
+    encoder, all concurrently. The memory budget is split evenly between the
+    renditions' frame buffer pools.
+
+    Args:
+        output_paths (dict): Rendition name (a key of RENDITIONS) -> output MP4 path.
+        layout (dict): Precomputed measure_text_layout() result, or None to measure here.
+
+    Returns:
+        bool: True if every rendition was written.
+    """
+    chapter_chunks, duration_per_chunk, total_duration = chapter_timeline(
+        chunks, chapter_index, next_chapter_index, wpm, chunk_stride, max_seconds, words_per_chunk)
+    num_chunks = len(chapter_chunks)
+    if layout is None:
+        layout = measure_text_layout([""] + [chunks[i] for i in chapter_chunks])
+    runs = frame_runs(total_duration, fps, num_chunks, duration_per_chunk)
+    rendition_budget_mb = memory_budget_mb / len(output_paths)
+    results = {}
+
+    def encode(name, output_path, report):
+        width, height, bitrate = RENDITIONS[name]
+
+        def render(key):
+            if key == "title":
+                return create_title_frame(book_title, author, chapter_title, width, height)
+            text = chunks[chapter_chunks[key]] if key is not None else ""
+            return render_text_frame(layout[text], width, height)
+
+        output_args = ["-c:v", "libx264", "-preset", preset, "-b:v", bitrate, "-pix_fmt", "yuv420p", output_path]
+        queue_depth = frame_queue_depth(width, height, rendition_budget_mb, render_threads)
+        process = open_ffmpeg_writer(output_args, width, height, fps)
+        try:
+            write_frames_pipelined(process, runs, render, width, height, queue_depth, render_threads, run_progress(report, num_chunks))
+            process.stdin.close()
+            results[name] = process.wait() == 0
+        except Exception as e:
+            print(f"Error encoding {name} for chapter {chapter_num}: {e}")
+            try:
+                process.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+            process.wait()
+            results[name] = False
+
+    print(f"Generating {', '.join(output_paths)} for chapter {chapter_num}, {num_chunks} chunks, duration {total_duration:.2f} seconds...")
+    threads = []
+    for i, (name, output_path) in enumerate(output_paths.items()):
+        # Only the first rendition reports progress; they all advance together
+        thread = threading.Thread(target=encode, args=(name, output_path, progress if i == 0 else None))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    for name, output_path in output_paths.items():
+        if results.get(name):
+            print(f"Video saved to {output_path}")
+    return all(results.get(name) for name in output_paths)
+
+# Draft helper: save a grid of evenly spaced frames instead of a video
+def create_chapter_contact_sheet(book_title, author, chunks, chapter_index, next_chapter_index, chapter_title, chapter_num, output_path,
+                                 wpm=450, width=DRAFT_WIDTH, height=DRAFT_HEIGHT, columns=CONTACT_SHEET_COLUMNS, rows=CONTACT_SHEET_ROWS,
+                                 chunk_stride=1, max_seconds=None, layout=None, words_per_chunk=WORDS_PER_CHUNK):
+    """
+    Save a PNG contact sheet of a chapter: the title frame followed by frames
+    sampled evenly across the chapter, laid out in a columns x rows grid.
+
+    Returns:
+        bool: True if the contact sheet was saved.
+    """
+    make_frame, total_duration, num_chunks = chapter_frame_function(
+        book_title, author, chunks, chapter_index, next_chapter_index, chapter_title, chapter_num, wpm, None,
+        width, height, chunk_stride, max_seconds, layout, words_per_chunk)
+    try:
+        sheet = Image.new("RGB", (columns * width, rows * height), color=(0, 0, 0))
+        count = columns * rows
+        # First tile is the title frame; the rest are spread over the chunks
+        text_duration = max(total_duration - TITLE_DURATION, 0)
+        times = [0.0] + [TITLE_DURATION + text_duration * (i + 0.5) / (count - 1) for i in range(count - 1)]
+        for i, t in enumerate(times):
+            tile = Image.fromarray(make_frame(min(t, total_duration)))
+            sheet.paste(tile, ((i % columns) * width, (i // columns) * height))
+        sheet.save(output_path)
+        print(f"Contact sheet for chapter {chapter_num} ({num_chunks} chunks) saved to {output_path}")
+        return True
+    except Exception as e:
+        print(f"Error creating contact sheet for chapter {chapter_num}: {e}")
         return False
 
-# Step 7: Main execution
+# Step 9: Render every chapter of a book
+def render_book(text_path, base_filename, book_title, author, hls=False, segment_duration=HLS_SEGMENT_DURATION,
+                segment_type=HLS_SEGMENT_TYPE, progress=None, draft=False, chunk_stride=1, max_seconds=None, contact_sheet=False,
+                ladder=None, memory_budget_mb=FRAME_MEMORY_BUDGET_MB, shard=False, lease_dir=None, lease_timeout=LEASE_TIMEOUT,
+                words_per_chunk=WORDS_PER_CHUNK):
+    """
+    Parse a chaptered text file and render one video (or HLS stream) per chapter.
+
+    Args:
+        text_path (str): Path to the chaptered text file.
+        base_filename (str): Book name used for output directories and file names.
+        book_title (str): Book title shown on the title frames.
+        author (str): Author shown on the title frames.
+        hls (bool): Stream HLS segments instead of writing one MP4 per chapter.
+        segment_duration (float): HLS segment length in seconds.
+        segment_type (str): HLS segment container ('mpegts' or 'fmp4').
+        progress (callable): Optional progress(chunks_done, total_chunks, chapter_num),
+            called as each chunk of the book is rendered.
+        draft (bool): Fast preview: DRAFT_WIDTH x DRAFT_HEIGHT at DRAFT_FPS with the
+            DRAFT_PRESET x264 preset, written under videos/<book>/drafts.
+        chunk_stride (int): Show only every K-th chunk of each chapter.
+        max_seconds (float): Cut each chapter after this many seconds.
+        contact_sheet (bool): Save a PNG contact sheet per chapter instead of a video.
+        ladder (list): Rendition names (keys of RENDITIONS) to encode together from a
+            single layout pass, written under videos/<book>/<rendition>. A draft ladder
+            keeps each rendition's size but uses the draft frame rate and preset, and is
+            written under videos/<book>/drafts/<rendition> so it never replaces the
+            published renditions. Not available with HLS or contact sheets.
+        memory_budget_mb (float): Memory for queued frame buffers while a chapter encodes.
+        shard (bool): Share the chapters with other workers through lease files
+            (see render_book_shards); not available for HLS.
+        lease_dir (str): Shared lease directory (default <output dir>/.leases).
+        lease_timeout (float): Seconds without a heartbeat before a lease is reclaimed.
+        words_per_chunk (int): Words shown on each frame.
+
+    Returns:
+        tuple: (successful_videos, total_chapters), or None if the text could not be processed.
+    """
+    if shard and hls:
+        print("Error: Sharded rendering writes outputs by atomic rename, which HLS streaming cannot do.")
+        return None
+    if ladder:
+        if hls:
+            print("Error: The rendition ladder writes MP4s; it cannot be combined with HLS streaming.")
+            return None
+        if contact_sheet:
+            print("Error: The rendition ladder writes MP4s; it cannot be combined with contact sheets.")
+            return None
+        unknown = [name for name in ladder if name not in RENDITIONS]
+        if unknown:
+            print(f"Error: Unknown rendition(s) {', '.join(unknown)}. Choose from: {', '.join(RENDITIONS)}")
+            return None
+
+    book_text, chapter_positions, chapter_titles = extract_text_and_chapters_from_text(text_path)
+    if book_text is None or chapter_positions is None:
+        return None
+
+    chunks = chunk_text(book_text, words_per_chunk)
+    chapter_indices = map_chapters_to_chunks(chapter_positions, chunks, words_per_chunk)
+    
+    if not chapter_indices:
+        print("No chapters detected. Treating as single section.")
+        chapter_indices = [0]
+        chapter_positions = [("1", 0)]
+        chapter_titles = ["Start"]
+
+    # Render settings
+    if draft or contact_sheet:
+        width, height, fps, preset = DRAFT_WIDTH, DRAFT_HEIGHT, DRAFT_FPS, DRAFT_PRESET
+    else:
+        width, height, fps, preset = 640, 360, 24, "medium"
+
+    # Create output directory
+    if ladder:
+        output_dir = os.path.join("videos", base_filename, "drafts") if draft else os.path.join("videos", base_filename)
+        for name in ladder:
+            os.makedirs(os.path.join(output_dir, name), exist_ok=True)
+    elif contact_sheet:
+        output_dir = os.path.join("videos", base_filename, "contact_sheets")
+    elif draft:
+        output_dir = os.path.join("videos", base_filename, "drafts")
+    else:
+        output_dir = os.path.join("videos", base_filename, "hls" if hls else "chapters")
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Chapter boundaries and the number of chunks each one shows
+    chapters = []
+    for i in range(len(chapter_indices)):
+        next_chapter_idx = chapter_indices[i + 1] if i + 1 < len(chapter_indices) else None
+        shown_chunks, _, _ = chapter_timeline(chunks, chapter_indices[i], next_chapter_idx,
+                                              chunk_stride=chunk_stride, max_seconds=max_seconds,
+                                              words_per_chunk=words_per_chunk)
+        chapters.append((chapter_positions[i][0], chapter_titles[i], chapter_indices[i], next_chapter_idx, len(shown_chunks)))
+    total_chunks = sum(chapter[4] for chapter in chapters)
+
+    # Output path(s) of a chapter, keyed by rendition (or by output kind)
+    def chapter_outputs(chapter_num):
+        if ladder:
+            return {name: os.path.join(output_dir, name, f"{base_filename}-{chapter_num}.mp4") for name in ladder}
+        if contact_sheet:
+            return {"sheet": os.path.join(output_dir, f"{base_filename}-{chapter_num}.png")}
+        if hls:
+            return {"hls": os.path.join(output_dir, f"{base_filename}-{chapter_num}")}
+        return {"video": os.path.join(output_dir, f"{base_filename}-{chapter_num}.mp4")}
+
+    def render_chapter(chapter, outputs, chapter_progress):
+        chapter_num, chapter_title, chapter_idx, next_chapter_idx, _ = chapter
+        render_options = dict(width=width, height=height, chunk_stride=chunk_stride, max_seconds=max_seconds,
+                              words_per_chunk=words_per_chunk)
+        print(f"Starting video creation for chapter {chapter_num}: {chapter_title}")
+        if ladder:
+            return create_chapter_ladder(book_title, author, chunks, chapter_idx, next_chapter_idx, chapter_title, chapter_num, outputs,
+                                         fps=fps, progress=chapter_progress, preset=preset,
+                                         chunk_stride=chunk_stride, max_seconds=max_seconds, memory_budget_mb=memory_budget_mb,
+                                         words_per_chunk=words_per_chunk)
+        if contact_sheet:
+            return create_chapter_contact_sheet(book_title, author, chunks, chapter_idx, next_chapter_idx, chapter_title, chapter_num,
+                                                outputs["sheet"], **render_options)
+        if hls:
+            return create_chapter_hls(book_title, author, chunks, chapter_idx, next_chapter_idx, chapter_title, chapter_num, outputs["hls"],
+                                      fps=fps, segment_duration=segment_duration, segment_type=segment_type, progress=chapter_progress,
+                                      preset=preset, memory_budget_mb=memory_budget_mb, **render_options)
+        return create_chapter_video(book_title, author, chunks, chapter_idx, next_chapter_idx, chapter_title, chapter_num, outputs["video"],
+                                    fps=fps, progress=chapter_progress, preset=preset, memory_budget_mb=memory_budget_mb,
+                                    **render_options)
+
+    # Progress callback for a chapter, offset by the chunks of the chapters before it
+    chapter_progress = {}
+    chunks_before = 0
+    for chapter_num, _, _, _, num_chunks in chapters:
+        if progress:
+            chapter_progress[chapter_num] = lambda done, n, offset=chunks_before, num=chapter_num: progress(offset + done, total_chunks, num)
+        chunks_before += num_chunks
+
+    # Shard work unit of a chapter: its number plus a digest of its outputs, settings and text, so
+    # a run with other renditions, draft settings or an edited text does not trust an earlier .done
+    def chapter_unit(chapter):
+        chapter_num, chapter_title, chapter_idx, next_chapter_idx, _ = chapter
+        render_key = dict(outputs=chapter_outputs(chapter_num), title=book_title, author=author, chapter_title=chapter_title,
+                          text=chunks[chapter_idx:next_chapter_idx], width=width, height=height, fps=fps, preset=preset,
+                          chunk_stride=chunk_stride, max_seconds=max_seconds, words_per_chunk=words_per_chunk)
+        digest = hashlib.sha256(json.dumps(render_key, sort_keys=True).encode("utf-8")).hexdigest()
+        return f"{base_filename}-{chapter_num}-{digest[:12]}"
+
+    if shard:
+        return render_book_shards(chapters, chapter_unit, output_dir, chapter_outputs, render_chapter, chapter_progress,
+                                  lease_dir, lease_timeout)
+
+    # Generate video for each chapter
+    successful_videos = 0
+    for chapter in chapters:
+        if render_chapter(chapter, chapter_outputs(chapter[0]), chapter_progress.get(chapter[0])):
+            successful_videos += 1
+        else:
+            print(f"Failed to create video for chapter {chapter[0]}")
+
+    return successful_videos, len(chapters)
+
+# Sharded rendering: claim chapters through lease files until the whole book is done
+def render_book_shards(chapters, chapter_unit, output_dir, chapter_outputs, render_chapter, chapter_progress,
+                       lease_dir=None, lease_timeout=LEASE_TIMEOUT):
+    """
+    Render the chapters of a book that no other worker holds, on any number of
+    hosts sharing `output_dir`.
+
+    Each chapter is a work unit, named by chapter_unit(chapter), claimed through
+    a lease in `lease_dir` (default <output_dir>/.leases; see
+    leases.LeaseDirectory). A claimed chapter renders to temporary files that
+    are renamed into place before the unit is marked done, so a crashed worker
+    never leaves a partial output. Its lease then expires and another worker
+    reclaims it; the crashed worker's render, if it resumes, is discarded. A
+    unit counts as done only while its outputs exist. The worker returns once
+    every chapter is done, or failed here.
+
+    Returns:
+        tuple: (chapters done by any worker, total_chapters)
+    """
+    leases = LeaseDirectory(lease_dir or os.path.join(output_dir, ".leases"), timeout=lease_timeout)
+    print(f"Sharded rendering as {leases.owner}, leases in {leases.path}")
+    units = {chapter[0]: chapter_unit(chapter) for chapter in chapters}
+
+    def is_done(chapter):
+        return leases.is_done(units[chapter[0]]) and all(os.path.exists(path) for path in chapter_outputs(chapter[0]).values())
+
+    pending = list(chapters)
+    rendered_here = 0
+    while pending:
+        claimed_any = False
+        for chapter in list(pending):
+            unit = units[chapter[0]]
+            if is_done(chapter):
+                pending.remove(chapter)
+                continue
+            if leases.is_done(unit):
+                print(f"Outputs of chapter {chapter[0]} are missing; rendering it again")
+                leases.clear_done(unit)
+            lease = leases.try_claim(unit)
+            if lease is None:
+                continue
+            claimed_any = True
+            pending.remove(chapter)
+            with lease:
+                print(f"Claimed chapter {chapter[0]} ({os.path.basename(lease.path)})")
+                outputs = chapter_outputs(chapter[0])
+                temp_outputs = {key: temp_output_path(path, leases.owner) for key, path in outputs.items()}
+                if not render_chapter(chapter, temp_outputs, chapter_progress.get(chapter[0])):
+                    # Releasing the lease lets another worker try this chapter
+                    print(f"Failed to create video for chapter {chapter[0]}")
+                elif not lease.held():
+                    # The new holder renders and publishes it; wait for that
+                    print(f"Discarding chapter {chapter[0]}: its lease was reclaimed while rendering")
+                    pending.append(chapter)
+                else:
+                    for key, path in outputs.items():
+                        os.replace(temp_outputs[key], path)
+                    if lease.complete():
+                        rendered_here += 1
+                    else:
+                        pending.append(chapter)
+                for temp_path in temp_outputs.values():
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+        if pending and not claimed_any:
+            print(f"Waiting for {len(pending)} chapters leased by other workers...")
+            time.sleep(leases.heartbeat_interval)
+
+    done = sum(1 for chapter in chapters if is_done(chapter))
+    print(f"This worker rendered {rendered_here} chapters; {done} of {len(chapters)} are done")
+    return done, len(chapters)
+
+# Command-line options; anything not given is prompted for
+def parse_args():
+    parser = argparse.ArgumentParser(description="Create chapter videos from a chaptered text file.")
+    parser.add_argument("--text-file", help="Name of the text file (e.g., 'test.txt')")
+    parser.add_argument("--title", help="Book title")
+    parser.add_argument("--author", help="Author name")
+    parser.add_argument("--hls", action="store_true",
+                        help="Stream each chapter as HLS segments (playable while rendering) instead of one MP4")
+    parser.add_argument("--segment-duration", type=float, default=HLS_SEGMENT_DURATION, help="HLS segment length in seconds")
+    parser.add_argument("--segment-type", choices=["mpegts", "fmp4"], default=HLS_SEGMENT_TYPE, help="HLS segment container")
+    parser.add_argument("--draft", action="store_true",
+                        help=f"Fast preview: {DRAFT_WIDTH}x{DRAFT_HEIGHT} at {DRAFT_FPS} fps, '{DRAFT_PRESET}' preset, "
+                             f"first {DRAFT_MAX_SECONDS} seconds of each chapter")
+    parser.add_argument("--draft-seconds", type=float,
+                        help=f"Seconds of each chapter to render (default {DRAFT_MAX_SECONDS} with --draft; 0 for all)")
+    parser.add_argument("--draft-stride", type=int, default=1, help="Render only every K-th chunk of each chapter")
+    parser.add_argument("--contact-sheet", action="store_true", help="Save a PNG contact sheet per chapter instead of video")
+    parser.add_argument("--ladder", type=lambda value: [name.strip() for name in value.split(",") if name.strip()],
+                        help=f"Comma-separated renditions to encode in one pass (from: {', '.join(RENDITIONS)})")
+    parser.add_argument("--memory-budget", type=float, default=FRAME_MEMORY_BUDGET_MB,
+                        help="MB of queued frame buffers between the render threads and the encoder")
+    parser.add_argument("--shard", action="store_true",
+                        help="Render only chapters not claimed by other workers (any host sharing videos/ and txts/)")
+    parser.add_argument("--lease-dir", help="Shared lease directory for --shard (default: <output dir>/.leases)")
+    parser.add_argument("--lease-timeout", type=float, default=LEASE_TIMEOUT,
+                        help="Seconds without a heartbeat before another worker reclaims a chapter")
+    parser.add_argument("--words-per-chunk", type=int, default=WORDS_PER_CHUNK, help="Words shown on each frame")
+    args = parser.parse_args()
+    if args.ladder:
+        if args.hls:
+            parser.error("--ladder writes MP4s and cannot be combined with --hls")
+        if args.contact_sheet:
+            parser.error("--ladder writes MP4s and cannot be combined with --contact-sheet")
+        unknown = [name for name in args.ladder if name not in RENDITIONS]
+        if unknown:
+            parser.error(f"unknown rendition(s) {', '.join(unknown)} for --ladder (choose from: {', '.join(RENDITIONS)})")
+    return args
+
+# Step 10: Main execution
 if __name__ == "__main__":
     start_time = time.time()
     texts_dir = "txts"
     chaptered_file_name = "chaptered.txt"
     script_name = os.path.basename(__file__)
+    args = parse_args()
     
-    text_filename = input("Enter the name of the text file (e.g., 'test.txt'): ").strip()
+    text_filename = args.text_file or input("Enter the name of the text file (e.g., 'test.txt'): ").strip()
     if not text_filename.lower().endswith('.txt'):
         text_filename += '.txt'
     # Remove .txt extension for directory name
     base_filename = os.path.splitext(text_filename)[0]
     text_path = os.path.join(texts_dir, base_filename, chaptered_file_name)
 
-    book_title = input("Enter the book title: ").strip()
-    author = input("Enter the author name: ").strip()
+    book_title = args.title if args.title is not None else input("Enter the book title: ").strip()
+    author = args.author if args.author is not None else input("Enter the author name: ").strip()
 
     if not os.path.exists(texts_dir):
         print(f"Error: '{texts_dir}' directory not found. Please create it and place your text files there.")
@@ -272,44 +1031,29 @@ if __name__ == "__main__":
     print(f"Memory usage before processing: {mem_before:.2f} MB")
     available_memory = psutil.virtual_memory().available / 1024 / 1024
     print(f"Available memory: {available_memory:.2f} MB")
-    if available_memory < 1000:
-        print("Warning: Low available memory. Consider increasing WORDS_PER_CHUNK.")
+    # Frame buffers are the only memory that grows with render speed; keep them within what is free
+    memory_budget_mb = args.memory_budget
+    if memory_budget_mb > available_memory / 2:
+        memory_budget_mb = available_memory / 2
+        print(f"Warning: Frame memory budget reduced to {memory_budget_mb:.0f} MB (half of available memory).")
+    print(f"Frame memory budget: {memory_budget_mb:.0f} MB")
 
-    book_text, chapter_positions, chapter_titles = extract_text_and_chapters_from_text(text_path)
-    if book_text is None or chapter_positions is None:
+    draft = args.draft or args.contact_sheet or args.draft_stride > 1 or bool(args.draft_seconds)
+    max_seconds = args.draft_seconds
+    if max_seconds is None and args.draft and args.draft_stride == 1:
+        max_seconds = DRAFT_MAX_SECONDS
+    result = render_book(text_path, base_filename, book_title, author, hls=args.hls,
+                         segment_duration=args.segment_duration, segment_type=args.segment_type,
+                         draft=draft, chunk_stride=args.draft_stride, max_seconds=max_seconds or None,
+                         contact_sheet=args.contact_sheet, ladder=args.ladder, memory_budget_mb=memory_budget_mb,
+                         shard=args.shard, lease_dir=args.lease_dir, lease_timeout=args.lease_timeout,
+                         words_per_chunk=args.words_per_chunk)
+    if result is None:
         print("Failed to process text file. Exiting.")
         exit(1)
+    successful_videos, total_chapters = result
 
-    chunks = chunk_text(book_text)
-    chapter_indices = map_chapters_to_chunks(chapter_positions, chunks)
-    total_words = len(book_text.split())
-    
-    if not chapter_positions:
-        print("No chapters detected. Treating as single section.")
-        chapter_indices = [0]
-        chapter_positions = [("1", 0)]
-        chapter_titles = ["Start"]
-
-    # Create output directory
-    output_dir = os.path.join("videos", base_filename, "chapters")
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Generate video for each chapter
-    successful_videos = 0
-    for i in range(len(chapter_indices)):
-        chapter_num = chapter_positions[i][0]
-        chapter_title = chapter_titles[i]
-        chapter_idx = chapter_indices[i]
-        next_chapter_idx = chapter_indices[i + 1] if i + 1 < len(chapter_indices) else None
-        output_filename = f"{base_filename}-{chapter_num}.mp4"
-        output_path = os.path.join(output_dir, output_filename)
-        print(f"Starting video creation for chapter {chapter_num}: {chapter_title}")
-        if create_chapter_video(book_title, author, chunks, chapter_idx, next_chapter_idx, chapter_title, chapter_num, output_path):
-            successful_videos += 1
-        else:
-            print(f"Failed to create video for chapter {chapter_num}")
-
-    print(f"Created {successful_videos} out of {len(chapter_indices)} chapter videos")
+    print(f"Created {successful_videos} out of {total_chapters} chapter videos")
     mem_after = process.memory_info().rss / 1024 / 1024
     print(f"Memory usage after processing: {mem_after:.2f} MB")
     end_time = time.time()
@@ -0,0 +1,129 @@
+import os
+import subprocess
+import threading
+import numpy as np
+
+
+# Temporary path next to `path` with the same extension, so ffmpeg picks the same container
+def _partial_path(path):
+    directory, filename = os.path.split(path)
+    stem, extension = os.path.splitext(filename)
+    return os.path.join(directory, f".{stem}.{os.getpid()}.partial{extension}")
+
+
+def _remove_if_exists(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def mux_looped_audio(video_path, audio_path, output_path, duration, audio_codec="aac", audio_bitrate="192k"):
+    """
+    Mux a video with an audio file looped (or trimmed) to exactly `duration` seconds.
+
+    The audio input is looped natively by ffmpeg (-stream_loop), so a short,
+    seamless loop tile covers any length without intermediate files; the video
+    stream is copied without re-encoding.
+
+    Args:
+        video_path (str): Input video file.
+        audio_path (str): Input audio file (e.g. a loop tile WAV).
+        output_path (str): Output video file.
+        duration (float): Output duration in seconds (normally the video's).
+        audio_codec (str): Audio codec for the output.
+        audio_bitrate (str): Audio bitrate for the output.
+
+    Returns:
+        subprocess.CompletedProcess: The finished ffmpeg run.
+
+    Raises:
+        RuntimeError: If ffmpeg exits with an error.
+    """
+    cmd = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-i", video_path,
+        "-stream_loop", "-1", "-i", audio_path,
+        "-map", "0:v:0", "-map", "1:a:0",
+        "-c:v", "copy",
+        "-c:a", audio_codec, "-b:a", audio_bitrate,
+        "-t", f"{duration:.3f}",
+        output_path,
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed with exit code {result.returncode}: {result.stderr.strip()}")
+    return result
+
+
+def mux_audio_stream(video_path, blocks, output_path, duration, sample_rate=44100, channels=1,
+                     audio_codec="aac", audio_bitrate="192k"):
+    """
+    Mux a video with audio samples streamed to ffmpeg over a pipe.
+
+    Blocks of float samples are written to ffmpeg's stdin as raw f32le as they
+    are produced, so no intermediate audio file is needed; the video stream is
+    copied without re-encoding. ffmpeg writes to a temporary file that is
+    renamed to output_path only on success: if the blocks raise midway, ffmpeg
+    is killed and the partial file removed, so a truncated MP4 is never left
+    at output_path.
+
+    Args:
+        video_path (str): Input video file.
+        blocks (iterable): Float blocks in [-1, 1], shaped (n,) or (n, channels).
+        output_path (str): Output video file.
+        duration (float): Output duration in seconds (normally the video's).
+        sample_rate (int): Sample rate of the blocks in Hz.
+        channels (int): Number of channels in each block.
+        audio_codec (str): Audio codec for the output.
+        audio_bitrate (str): Audio bitrate for the output.
+
+    Returns:
+        int: Number of sample frames written to ffmpeg.
+
+    Raises:
+        RuntimeError: If ffmpeg exits with an error.
+    """
+    partial_path = _partial_path(output_path)
+    cmd = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "f32le", "-ar", str(sample_rate), "-ac", str(channels), "-i", "pipe:0",
+        "-i", video_path,
+        "-map", "1:v:0", "-map", "0:a:0",
+        "-c:v", "copy",
+        "-c:a", audio_codec, "-b:a", audio_bitrate,
+        "-t", f"{duration:.3f}",
+        partial_path,
+    ]
+    process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    # Drain stderr in the background so a chatty ffmpeg can never block the pipe
+    stderr_chunks = []
+    stderr_thread = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+    stderr_thread.start()
+    frames_written = 0
+    try:
+        for block in blocks:
+            process.stdin.write(np.ascontiguousarray(block, dtype="<f4").tobytes())
+            frames_written += len(block)
+    except BrokenPipeError:
+        # ffmpeg stopped reading; its exit code below tells whether that was an error
+        pass
+    except BaseException:
+        # Closing stdin would let ffmpeg finalize a valid-looking, truncated file
+        process.kill()
+        process.wait()
+        stderr_thread.join()
+        _remove_if_exists(partial_path)
+        raise
+    try:
+        process.stdin.close()
+    except BrokenPipeError:
+        pass
+    process.wait()
+    stderr_thread.join()
+    if process.returncode != 0:
+        _remove_if_exists(partial_path)
+        stderr = b"".join(stderr_chunks).decode(errors="replace").strip()
+        raise RuntimeError(f"ffmpeg failed with exit code {process.returncode}: {stderr}")
+    os.replace(partial_path, output_path)
+    return frames_written
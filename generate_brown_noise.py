@@ -1,37 +1,56 @@
+import os
 import numpy as np
-from scipy.io import wavfile
+from audio_effects import EffectsChain, Limiter, LowPass, iter_processed_blocks
+from noise import generate_noise, noise_blocks, stream_loop_tile, write_wav_stream
 
 # Parameters
 sample_rate = 44100  # Hz (standard audio sampling rate)
 duration = 60.0      # seconds (adjust as needed)
 output_audio_file = "brown_noise.wav"
+lowpass_cutoff = None  # Hz; set (e.g. 500.0) to darken the noise further (optional)
+seed = None          # Set to an int for reproducible output
+workers = os.cpu_count() or 1  # Worker processes; output does not depend on this
+make_loop = True     # Produce a seamless loop tile of `duration` seconds (mux loops it)
+crossfade = 0.5      # seconds of tail crossfaded into the head when making a loop tile
 
 # Step 1: Generate brown noise
-def generate_brown_noise(sample_rate, duration):
-    # Calculate number of samples
-    num_samples = int(sample_rate * duration)
-    
-    # Generate white noise (Gaussian distribution)
-    white_noise = np.random.normal(0, 1, num_samples)
-    
-    # Integrate white noise to produce brown noise
-    brown_noise = np.cumsum(white_noise)
-    
-    # Normalize to [-1, 1] range to prevent clipping, with 50% amplitude for safety
-    brown_noise = brown_noise / np.max(np.abs(brown_noise)) * .5
-    return brown_noise
+def generate_brown_noise(sample_rate, duration, seed=None, workers=1):
+    # Leaky-integrated white noise, generated in float32 blocks with the
+    # integrator state carried across blocks (no global normalization needed)
+    return generate_noise("brown", sample_rate, duration, seed, workers)
 
 # Step 2: Save brown noise as WAV file
 def save_brown_noise(brown_noise, sample_rate, output_file):
-    # Convert to 16-bit PCM format (standard for WAV)
-    brown_noise_int = np.int16(brown_noise * 32767)
-    wavfile.write(output_file, sample_rate, brown_noise_int)
+    # Accept either a full signal or an iterable of blocks, written incrementally
+    # to 16-bit PCM (standard for WAV)
+    blocks = [brown_noise] if isinstance(brown_noise, np.ndarray) else brown_noise
+    write_wav_stream(output_file, blocks, sample_rate)
     print(f"Saved brown noise to: {output_file}")
 
 # Main execution
 if __name__ == "__main__":
-    # Generate brown noise
-    brown_noise = generate_brown_noise(sample_rate, duration)
+    # Generate brown noise block by block
+    num_samples = int(sample_rate * duration)
+    crossfade_samples = int(sample_rate * crossfade) if make_loop else 0
+    seed_seq = np.random.SeedSequence(seed)
+    print(f"Seed: {seed_seq.entropy}")
+    
+    # Optional low-pass, then a limiter as a safety net against clipping
+    chain = EffectsChain()
+    if lowpass_cutoff:
+        chain.append(LowPass(lowpass_cutoff, sample_rate))
+        print(f"Applying low-pass filter at {lowpass_cutoff} Hz")
+    chain.append(Limiter(ceiling=1.0))
     
-    # Save to WAV file
-    save_brown_noise(brown_noise, sample_rate, output_audio_file)
\ No newline at end of file
+    def processed_blocks():
+        chain.reset()
+        return iter_processed_blocks(chain, noise_blocks("brown", num_samples + crossfade_samples, sample_rate, seed_seq, workers))
+
+    if make_loop:
+        # Linear crossfade of the tail into the head plus DC matching, so the
+        # tile loops without clicks or offset; streamed in constant memory
+        print(f"Making seamless loop tile with {crossfade} second crossfade")
+        save_brown_noise(stream_loop_tile(processed_blocks, crossfade_samples, correlated=True), sample_rate, output_audio_file)
+    else:
+        # Stream to WAV file
+        save_brown_noise(processed_blocks(), sample_rate, output_audio_file)
@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import numpy as np
+from audio_effects import EffectsChain, Gain, Limiter, iter_processed_blocks
+from noise import NOISE_COLORS, noise_blocks, stream_loop_tile, write_wav_stream
+
+# Parameters
+sample_rate = 44100  # Hz (standard audio sampling rate)
+duration = 60.0      # seconds (adjust as needed)
+color = "pink"       # white, pink, brown, blue or violet
+amplitude = 1.0      # Extra gain on top of each color's default level
+seed = None          # Set to an int for reproducible output
+workers = os.cpu_count() or 1  # Worker processes; output does not depend on this
+make_loop = True     # Produce a seamless loop tile of `duration` seconds (mux loops it)
+crossfade = 0.5      # seconds of tail crossfaded into the head when making a loop tile
+
+# Main execution
+if __name__ == "__main__":
+    # Allow overriding color and duration via command-line arguments
+    if len(sys.argv) > 1:
+        color = sys.argv[1].strip().lower()
+    if len(sys.argv) > 2:
+        duration = float(sys.argv[2])
+    if color not in NOISE_COLORS:
+        print(f"Error: Unknown noise color '{color}'. Choose from: {', '.join(NOISE_COLORS)}")
+        sys.exit(1)
+    output_audio_file = f"{color}_noise.wav"
+
+    start_time = time.time()
+    seed_seq = np.random.SeedSequence(seed)
+    print(f"Generating {color} noise for {duration} seconds with {workers} workers (seed: {seed_seq.entropy})...")
+    num_samples = int(sample_rate * duration)
+    crossfade_samples = int(sample_rate * crossfade) if make_loop else 0
+
+    # Amplitude scaling, then a limiter as a safety net against clipping
+    chain = EffectsChain([Gain(amplitude), Limiter(ceiling=1.0)])
+
+    def processed_blocks():
+        chain.reset()
+        return iter_processed_blocks(chain, noise_blocks(color, num_samples + crossfade_samples, sample_rate, seed_seq, workers))
+
+    if make_loop:
+        # Crossfade the tail into the head so the tile loops without clicks
+        # (linear with DC matching for brown noise, equal-power otherwise),
+        # streamed so memory does not grow with the duration
+        print(f"Making seamless loop tile with {crossfade} second crossfade")
+        write_wav_stream(output_audio_file, stream_loop_tile(processed_blocks, crossfade_samples, correlated=(color == "brown")),
+                         sample_rate)
+    else:
+        write_wav_stream(output_audio_file, processed_blocks(), sample_rate)
+
+    elapsed_time = time.time() - start_time
+    print(f"Saved {color} noise to: {output_audio_file} ({elapsed_time:.2f} seconds)")
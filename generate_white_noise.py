@@ -1,25 +1,23 @@
 import numpy as np
-from scipy.io import wavfile
 import os
+from audio_effects import Compressor, EffectsChain, Gain, Limiter, iter_processed_blocks, process_in_blocks
+from noise import generate_noise, noise_blocks, stream_loop_tile, write_wav_stream
 
 # Parameters
 sample_rate = 44100  # Hz (standard audio sampling rate)
 duration = 60.0      # seconds (1 minute, suitable for looping in a video)
 output_audio_file = "white_noise.wav"
 amplitude = 0.1      # Reduced from 0.98 to 30% for lower volume
-apply_compressor = False  # Disable compressor to avoid boosting loudness (optional)
+use_compressor = False  # Disable compressor to avoid boosting loudness (optional)
+seed = None          # Set to an int for reproducible output
+workers = os.cpu_count() or 1  # Worker processes; output does not depend on this
+make_loop = True     # Produce a seamless loop tile of `duration` seconds (mux loops it)
+crossfade = 0.5      # seconds of tail crossfaded into the head when making a loop tile
 
 # Step 1: Generate white noise
-def generate_white_noise(sample_rate, duration):
-    # Calculate number of samples
-    num_samples = int(sample_rate * duration)
-    
-    # Generate white noise (Gaussian distribution)
-    white_noise = np.random.normal(0, 1, num_samples)
-    
-    # Normalize to [-1, 1] range
-    white_noise = white_noise / np.max(np.abs(white_noise))
-    return white_noise
+def generate_white_noise(sample_rate, duration, seed=None, workers=1):
+    # Generate white noise (Gaussian distribution) in float32 blocks, scaled to [-1, 1]
+    return generate_noise("white", sample_rate, duration, seed, workers)
 
 # Step 2: Apply compressor to increase perceived loudness (optional)
 def apply_compressor(signal, threshold=0.9, ratio=2.0):
@@ -28,21 +26,15 @@ def apply_compressor(signal, threshold=0.9, ratio=2.0):
     threshold: Amplitude above which compression starts (0.0 to 1.0, higher = less compression)
     ratio: Compression ratio (e.g., 2.0 means 2:1 compression, softer than 4.0)
     """
-    output = signal.copy()
-    for i in range(len(output)):
-        if abs(output[i]) > threshold:
-            sign = np.sign(output[i])
-            excess = abs(output[i]) - threshold
-            compressed_excess = excess / ratio
-            output[i] = sign * (threshold + compressed_excess)
-    return output
+    return process_in_blocks(Compressor(threshold=threshold, ratio=ratio), signal)
 
 # Step 3: Save white noise as WAV file
 def save_white_noise(white_noise, sample_rate, output_file):
     try:
-        # Convert to 16-bit PCM format (standard for WAV)
-        white_noise_int = np.int16(white_noise * 32767)
-        wavfile.write(output_file, sample_rate, white_noise_int)
+        # Accept either a full signal or an iterable of blocks; blocks are written
+        # incrementally so memory use does not grow with the duration
+        blocks = [white_noise] if isinstance(white_noise, np.ndarray) else white_noise
+        write_wav_stream(output_file, blocks, sample_rate)
         print(f"Saved white noise to {output_file}")
         if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
             print(f"File {output_file} created successfully, size: {os.path.getsize(output_file)} bytes")
@@ -53,21 +45,32 @@ def save_white_noise(white_noise, sample_rate, output_file):
 
 # Main execution
 if __name__ == "__main__":
-    # Generate white noise
+    # Generate white noise block by block
     print(f"Generating white noise for {duration} seconds...")
-    white_noise = generate_white_noise(sample_rate, duration)
-    
-    # Apply compressor if enabled
-    if apply_compressor:
-        white_noise = apply_compressor(white_noise, threshold=0.9, ratio=2.0)
-        print("Applied compressor with softer settings")
-    
-    # Apply amplitude scaling
-    white_noise = white_noise * amplitude
-    print(f"Applied amplitude scaling: {amplitude}")
+    num_samples = int(sample_rate * duration)
+    crossfade_samples = int(sample_rate * crossfade) if make_loop else 0
+    seed_seq = np.random.SeedSequence(seed)
+    print(f"Seed: {seed_seq.entropy}")
     
-    # Ensure final signal is within [-1, 1] to avoid clipping
-    white_noise = np.clip(white_noise, -1.0, 1.0)
+    # Build the effects chain: optional compressor, amplitude scaling, then a
+    # limiter to keep the final signal within [-1, 1] and avoid clipping
+    chain = EffectsChain()
+    if use_compressor:
+        chain.append(Compressor(threshold=0.9, ratio=2.0))
+        print("Applying compressor with softer settings")
+    chain.append(Gain(amplitude))
+    chain.append(Limiter(ceiling=1.0))
+    print(f"Applying amplitude scaling: {amplitude}")
     
-    # Save to WAV file
-    save_white_noise(white_noise, sample_rate, output_audio_file)
\ No newline at end of file
+    def processed_blocks():
+        chain.reset()
+        return iter_processed_blocks(chain, noise_blocks("white", num_samples + crossfade_samples, sample_rate, seed_seq, workers))
+
+    if make_loop:
+        # Crossfade the tail into the head so the tile loops without clicks,
+        # streamed so memory does not grow with the duration
+        print(f"Making seamless loop tile with {crossfade} second crossfade")
+        save_white_noise(stream_loop_tile(processed_blocks, crossfade_samples), sample_rate, output_audio_file)
+    else:
+        # Stream to WAV file
+        save_white_noise(processed_blocks(), sample_rate, output_audio_file)
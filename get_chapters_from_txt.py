@@ -43,7 +43,7 @@ def process_text_file(input_file, toc):
     # Check if input file exists
     if not os.path.exists(input_file):
         print(f"Error: Input file '{input_file}' not found.")
-        return
+        return None
     
     # Read the input text file
     with open(input_file, 'r', encoding='utf-8') as f:
@@ -54,7 +54,7 @@ def process_text_file(input_file, toc):
     
     # Generate output file path
     base_name = os.path.basename(input_file)  # e.g., "the_scarlet_letter.txt"
-    filename =  Path(input_filename).stem
+    filename = Path(base_name).stem
     output_dir = os.path.join("txts", filename)
     os.makedirs(output_dir, exist_ok=True)  # Create txts/chaptered if it doesn't exist
     output_file = os.path.join(output_dir, "chaptered.txt")  # e.g., txts/chaptered/the_scarlet_letter.txt
@@ -64,7 +64,8 @@ def process_text_file(input_file, toc):
         f.write(modified_text)
     
     print(f"Output saved to: {output_file}")
-    
+    return output_file
+
 # TODO: This is just a wip with hardcoded TOC, will need to figure out how to make this dynamic
 
 # Table of contents
@@ -96,13 +97,11 @@ XXIV. CONCLUSION                                 315"""
 # Directory containing the input text file
 input_dir = "input-txts"
 
-# Specify the input file name (e.g., "the_scarlet_letter.txt")
-input_filename = "test.txt"  # Change this to your input file name
-
-filename = input("Enter which txt file to process from input-txts/: ")
+if __name__ == "__main__":
+    filename = input("Enter which txt file to process from input-txts/: ")
 
-# Construct the full path to the input file
-input_file = os.path.join(input_dir, f"{filename}.txt")
+    # Construct the full path to the input file
+    input_file = os.path.join(input_dir, f"{filename}.txt")
 
-# Process the specified text file
-process_text_file(input_file, toc)
\ No newline at end of file
+    # Process the specified text file
+    process_text_file(input_file, toc)
\ No newline at end of file
@@ -0,0 +1,391 @@
+import argparse
+import heapq
+import itertools
+import json
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Defaults for the local job service
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+PROGRESS_INTERVAL = 0.5  # seconds between progress reports from a worker
+WORKER_CHECK_INTERVAL = 1.0  # seconds between checks for crashed workers
+
+# Frame rate and reading speed of full (non-draft) renders in render_book()
+RENDER_FPS = 24
+RENDER_WPM = 450
+
+
+# ---------------------------------------------------------------------------
+# Worker side: each worker process imports the pipeline once and then runs
+# jobs until it is told to stop.
+# ---------------------------------------------------------------------------
+
+def warm_up_worker():
+    """
+    Import the heavy modules once per worker process and load the fonts for full
+    and draft frames into create_clips_from_txt's font cache (load_font).
+    """
+    import create_clips_from_txt  # PIL, numpy, psutil
+    import add_noise_to_video  # moviepy, scipy, noise synthesis, audio effects
+    import get_chapters_from_txt
+    for width, height in ((640, 360), (create_clips_from_txt.DRAFT_WIDTH, create_clips_from_txt.DRAFT_HEIGHT)):
+        create_clips_from_txt.create_title_frame("", "", "", width, height)
+        create_clips_from_txt.create_text_frame("", width, height)
+
+
+def run_chapterize(params, report):
+    """Insert chapter markers: params {'name': 'test'} or {'input_file': 'input-txts/test.txt'}."""
+    import get_chapters_from_txt
+    input_file = params.get("input_file") or os.path.join(get_chapters_from_txt.input_dir, f"{params['name']}.txt")
+    output_file = get_chapters_from_txt.process_text_file(input_file, get_chapters_from_txt.toc)
+    if output_file is None:
+        raise FileNotFoundError(f"Input file '{input_file}' not found")
+    return {"output": output_file}
+
+
+def run_render(params, report):
+    """
+    Render chapter videos: params {'text_file', 'title', 'author', 'hls', 'ladder',
+    'memory_budget_mb', 'words_per_chunk'}, plus the draft options {'draft', 'chunk_stride', 'max_seconds', 'contact_sheet'}.
+    """
+    import create_clips_from_txt
+    base_filename = os.path.splitext(params["text_file"])[0]
+    text_path = os.path.join("txts", base_filename, "chaptered.txt")
+    if not os.path.exists(text_path):
+        raise FileNotFoundError(f"'{text_path}' not found")
+    draft = params.get("draft", False) or params.get("contact_sheet", False)
+    fps = create_clips_from_txt.DRAFT_FPS if draft else RENDER_FPS
+    words_per_chunk = params.get("words_per_chunk", create_clips_from_txt.WORDS_PER_CHUNK)
+    frames_per_chunk = fps * (60 / RENDER_WPM) * words_per_chunk
+
+    def progress(chunks_done, chunks_total, chapter_num):
+        report(chunks_done=chunks_done, chunks_total=chunks_total, chapter=chapter_num,
+               frames_done=int(chunks_done * frames_per_chunk))
+
+    result = create_clips_from_txt.render_book(
+        text_path, base_filename, params.get("title", ""), params.get("author", ""),
+        hls=params.get("hls", False), progress=progress, draft=draft,
+        chunk_stride=params.get("chunk_stride", 1), max_seconds=params.get("max_seconds"),
+        contact_sheet=params.get("contact_sheet", False), ladder=params.get("ladder"),
+        memory_budget_mb=params.get("memory_budget_mb", create_clips_from_txt.FRAME_MEMORY_BUDGET_MB),
+        words_per_chunk=words_per_chunk)
+    if result is None:
+        raise RuntimeError(f"Failed to process text file '{text_path}'")
+    successful_videos, total_chapters = result
+    if successful_videos < total_chapters:
+        raise RuntimeError(f"Created only {successful_videos} out of {total_chapters} chapter videos")
+    return {"successful_videos": successful_videos, "total_chapters": total_chapters}
+
+
+def run_mux(params, report):
+    """Add noise to a video: params {'video', 'noise': 'brown:0.5'} or {'video', 'audio': 'audio/x.wav'}."""
+    import add_noise_to_video
+    from noise import NoiseSpec
+    output_dir = params.get("output_dir", "videos_with_audio")
+    if "noise" in params:
+        output_path = add_noise_to_video.add_generated_noise_to_video(params["video"], NoiseSpec.parse(params["noise"]), output_dir)
+    else:
+        output_path = add_noise_to_video.add_noise_to_video(params["video"], params["audio"], output_dir)
+    if output_path is None:
+        raise RuntimeError(f"Failed to mux '{params['video']}'")
+    return {"output": output_path}
+
+
+JOB_RUNNERS = {
+    "chapterize": run_chapterize,
+    "render": run_render,
+    "mux": run_mux,
+}
+
+
+def worker_main(task_queue, event_queue):
+    warm_up_worker()
+    pid = os.getpid()
+    event_queue.put(("ready", None, pid))
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        job_id, job_type, params = task
+        last_report = [0.0]
+        unsent = {}
+
+        def report(**progress):
+            unsent.update(progress)
+            now = time.time()
+            if now - last_report[0] >= PROGRESS_INTERVAL:
+                last_report[0] = now
+                event_queue.put(("progress", job_id, dict(unsent)))
+                unsent.clear()
+
+        event_queue.put(("started", job_id, pid))
+        try:
+            result = JOB_RUNNERS[job_type](params, report)
+            # The last updates may have been throttled; send them before finishing
+            if unsent:
+                event_queue.put(("progress", job_id, dict(unsent)))
+            event_queue.put(("done", job_id, result))
+        except Exception as e:
+            traceback.print_exc()
+            event_queue.put(("failed", job_id, f"{type(e).__name__}: {e}"))
+
+
+# ---------------------------------------------------------------------------
+# Service side: priority queue, dispatcher and progress bookkeeping.
+# ---------------------------------------------------------------------------
+
+class JobService:
+    """
+    Queue jobs by priority and run them on a bounded pool of warm worker processes.
+
+    Jobs are only handed to the workers when one is free, so a high-priority
+    job submitted later still runs before queued lower-priority ones. Each
+    worker has its own task queue, so the service knows which worker holds a
+    job from the moment it is dispatched and can fail it if that worker dies.
+    """
+
+    def __init__(self, num_workers=DEFAULT_WORKERS):
+        self.num_workers = num_workers
+        self.context = mp.get_context("spawn")
+        self.event_queue = self.context.Queue()
+        self.condition = threading.Condition()
+        self.jobs = {}
+        self.pending = []  # heap of (-priority, sequence, job_id)
+        self.sequence = itertools.count()
+        self.workers = {}  # pid -> Process
+        self.task_queues = {}  # pid -> that worker's task queue
+        self.ready_workers = set()
+        self.worker_jobs = {}  # pid -> job_id dispatched to it and not yet finished
+        self.running = True
+
+    def start(self):
+        for _ in range(self.num_workers):
+            self._spawn_worker()
+        threading.Thread(target=self._dispatch_loop, daemon=True).start()
+        threading.Thread(target=self._event_loop, daemon=True).start()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        for task_queue in self.task_queues.values():
+            task_queue.put(None)
+        for process in self.workers.values():
+            process.join(timeout=5)
+
+    def _spawn_worker(self):
+        task_queue = self.context.Queue()
+        process = self.context.Process(target=worker_main, args=(task_queue, self.event_queue), daemon=True)
+        process.start()
+        self.workers[process.pid] = process
+        self.task_queues[process.pid] = task_queue
+
+    def submit(self, job_type, params, priority=0):
+        if job_type not in JOB_RUNNERS:
+            raise ValueError(f"Unknown job type: {job_type}. Choose from: {', '.join(JOB_RUNNERS)}")
+        job_id = uuid.uuid4().hex[:12]
+        with self.condition:
+            self.jobs[job_id] = {
+                "id": job_id, "type": job_type, "params": params, "priority": priority,
+                "status": "queued", "submitted_at": time.time(), "started_at": None, "finished_at": None,
+                "progress": {}, "result": None, "error": None,
+            }
+            heapq.heappush(self.pending, (-priority, next(self.sequence), job_id))
+            self.condition.notify_all()
+        return job_id
+
+    def cancel(self, job_id):
+        """Cancel a queued job; returns False if it is unknown or already running."""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None or job["status"] != "queued":
+                return False
+            job["status"] = "cancelled"
+            job["finished_at"] = time.time()
+            return True
+
+    def _idle_workers(self):
+        return sorted(pid for pid in self.ready_workers if pid not in self.worker_jobs)
+
+    def _dispatch_loop(self):
+        while True:
+            with self.condition:
+                while self.running and not (self.pending and self._idle_workers()):
+                    self.condition.wait()
+                if not self.running:
+                    return
+                _, _, job_id = heapq.heappop(self.pending)
+                job = self.jobs[job_id]
+                if job["status"] != "queued":
+                    continue
+                # Record the assignment now: a worker can die before it reports "started"
+                pid = self._idle_workers()[0]
+                self.worker_jobs[pid] = job_id
+                job["status"] = "dispatched"
+                self.task_queues[pid].put((job_id, job["type"], job["params"]))
+
+    def _event_loop(self):
+        # Workers are checked on a timer, not only when the queue is quiet: live
+        # workers report progress more often than the get() timeout
+        next_check = time.monotonic() + WORKER_CHECK_INTERVAL
+        while self.running:
+            try:
+                kind, job_id, payload = self.event_queue.get(timeout=max(0.0, next_check - time.monotonic()))
+            except queue.Empty:
+                pass
+            else:
+                self._handle_event(kind, job_id, payload)
+            if time.monotonic() >= next_check:
+                self._check_workers()
+                next_check = time.monotonic() + WORKER_CHECK_INTERVAL
+
+    def _handle_event(self, kind, job_id, payload):
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if kind == "ready":
+                self.ready_workers.add(payload)
+            elif kind == "started":
+                job["status"] = "running"
+                job["started_at"] = time.time()
+            elif kind == "progress":
+                job["progress"].update(payload)
+            elif kind in ("done", "failed"):
+                job["status"] = kind
+                job["finished_at"] = time.time()
+                if kind == "done":
+                    job["result"] = payload
+                else:
+                    job["error"] = payload
+                for pid, running_job in list(self.worker_jobs.items()):
+                    if running_job == job_id:
+                        del self.worker_jobs[pid]
+            self.condition.notify_all()
+
+    def _check_workers(self):
+        """Fail the job of any worker that died and start a replacement."""
+        with self.condition:
+            for pid, process in list(self.workers.items()):
+                if process.is_alive():
+                    continue
+                print(f"Worker {pid} exited with code {process.exitcode}; starting a replacement")
+                del self.workers[pid]
+                del self.task_queues[pid]
+                self.ready_workers.discard(pid)
+                job_id = self.worker_jobs.pop(pid, None)
+                if job_id:
+                    job = self.jobs[job_id]
+                    job["status"] = "failed"
+                    job["finished_at"] = time.time()
+                    job["error"] = f"Worker process exited with code {process.exitcode}"
+                if self.running:
+                    self._spawn_worker()
+            self.condition.notify_all()
+
+    def describe(self, job_id):
+        """Return a JSON-friendly snapshot of a job, including rates and ETA."""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job, progress=dict(job["progress"]))
+        progress = snapshot["progress"]
+        if snapshot["started_at"]:
+            end = snapshot["finished_at"] or time.time()
+            elapsed = end - snapshot["started_at"]
+            snapshot["elapsed_seconds"] = round(elapsed, 1)
+            done, total = progress.get("chunks_done"), progress.get("chunks_total")
+            if snapshot["status"] == "done" and total:
+                # A cut-off draft can end before its last chunk shows; a finished job is complete
+                done = progress["chunks_done"] = total
+            if done and total and elapsed > 0:
+                progress["percent"] = round(100 * done / total, 1)
+                progress["frames_per_second"] = round(progress.get("frames_done", 0) / elapsed, 1)
+                if snapshot["status"] == "running":
+                    progress["eta_seconds"] = round(elapsed / done * (total - done), 1)
+        return snapshot
+
+    def list_jobs(self):
+        with self.condition:
+            job_ids = list(self.jobs)
+        return [self.describe(job_id) for job_id in job_ids]
+
+
+def make_handler(service):
+    class JobRequestHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _job_id(self):
+            parts = self.path.strip("/").split("/")
+            return parts[1] if len(parts) == 2 and parts[0] == "jobs" else None
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/jobs":
+                return self._send_json(200, service.list_jobs())
+            job = service.describe(self._job_id()) if self._job_id() else None
+            if job is None:
+                return self._send_json(404, {"error": "Job not found"})
+            self._send_json(200, job)
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/jobs":
+                return self._send_json(404, {"error": "Not found"})
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                job_id = service.submit(body.get("type"), body.get("params", {}), int(body.get("priority", 0)))
+            except (ValueError, TypeError) as e:
+                return self._send_json(400, {"error": str(e)})
+            self._send_json(201, {"id": job_id})
+
+        def do_DELETE(self):
+            job_id = self._job_id()
+            if job_id and service.cancel(job_id):
+                return self._send_json(200, {"id": job_id, "status": "cancelled"})
+            self._send_json(409, {"error": "Only queued jobs can be cancelled"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return JobRequestHandler
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Local job service for chapterize, render and mux jobs.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Address to listen on (default: localhost only)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of warm worker processes")
+    return parser.parse_args()
+
+
+# Example usage:
+#   python job_service.py --workers 2
+#   curl -X POST localhost:8765/jobs -d '{"type": "render", "priority": 5,
+#        "params": {"text_file": "test.txt", "title": "The Scarlet Letter", "author": "Nathaniel Hawthorne"}}'
+#   curl localhost:8765/jobs/<id>
+if __name__ == "__main__":
+    args = parse_args()
+    service = JobService(args.workers)
+    service.start()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"Job service listening on http://{args.host}:{args.port} with {args.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down...")
+    finally:
+        server.server_close()
+        service.stop()
@@ -0,0 +1,204 @@
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+
+# Seconds without a heartbeat after which another worker may take a lease over
+LEASE_TIMEOUT = 120
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+# Temporary path next to `path` (same directory and extension) for an atomic rename into place
+def temp_output_path(path, owner):
+    directory, filename = os.path.split(path)
+    stem, extension = os.path.splitext(filename)
+    safe_owner = "".join(c if c.isalnum() else "-" for c in owner)
+    return os.path.join(directory, f".{stem}.{safe_owner}.tmp{extension}")
+
+class Lease:
+    """
+    A claimed work unit. While held, a background thread refreshes the lease
+    file's mtime (the heartbeat); if the file disappears or holds another
+    claim's token, because another worker took the lease over, the lease is
+    marked lost. Generation numbers restart at 0 once a unit's lease files are
+    gone, so ownership is always decided by the token, never by the path.
+    Check held() before publishing anything for the unit.
+    """
+    def __init__(self, directory, unit, generation, token, heartbeat_interval):
+        self.directory = directory
+        self.unit = unit
+        self.generation = generation
+        self.token = token
+        self.path = directory._lease_path(unit, generation)
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._heartbeat, args=(heartbeat_interval,), daemon=True)
+        self._thread.start()
+
+    def _owned(self):
+        return self.directory.read_token(self.path) == self.token
+
+    def _heartbeat(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                if not self._owned():
+                    raise FileNotFoundError(self.path)
+                os.utime(self.path)
+            except FileNotFoundError:
+                print(f"Warning: Lease on {self.unit} was taken over by another worker")
+                self.lost = True
+                return
+
+    def held(self):
+        """
+        Whether this worker still owns the unit: the lease file still holds this
+        claim's token and no later generation has been claimed. Checked now, not
+        at the last heartbeat.
+        """
+        if not self.lost:
+            generations = self.directory.generations(self.unit)
+            if not generations or generations[-1] != self.generation or not self._owned():
+                print(f"Warning: Lease on {self.unit} was taken over by another worker")
+                self.lost = True
+        return not self.lost
+
+    def complete(self):
+        """
+        Mark the unit done for every worker, then drop the lease.
+
+        Returns:
+            bool: False, with nothing marked, if the lease was lost.
+        """
+        if not self.held():
+            self.release()
+            return False
+        self.directory.mark_done(self.unit)
+        self.release()
+        return True
+
+    def release(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        # After a takeover the path may belong to a newer claim; leave that one alone
+        if not self._owned():
+            return
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+class LeaseDirectory:
+    """
+    Work units claimed through lease files in a directory shared by every worker
+    (e.g. on an NFS mount), with no coordinator.
+
+    A unit's lease is '<unit>.<generation>.lease', created with O_CREAT|O_EXCL
+    so exactly one worker wins each generation, and holding a random token that
+    identifies the claim. A lease whose mtime is older
+    than `timeout` is expired; it is reclaimed by creating the next generation,
+    which again only one worker can do, and the winner removes the old file.
+    A finished unit gets a '<unit>.done' marker. Hosts' clocks are assumed to be
+    in sync to well within `timeout`.
+    """
+    def __init__(self, path, timeout=LEASE_TIMEOUT, heartbeat_interval=None, owner=None):
+        self.path = path
+        self.timeout = timeout
+        self.heartbeat_interval = heartbeat_interval or timeout / 4
+        self.owner = owner or worker_id()
+        os.makedirs(path, exist_ok=True)
+
+    def _lease_path(self, unit, generation):
+        return os.path.join(self.path, f"{unit}.{generation}.lease")
+
+    def _done_path(self, unit):
+        return os.path.join(self.path, f"{unit}.done")
+
+    def generations(self, unit):
+        prefix, suffix = f"{unit}.", ".lease"
+        generations = []
+        for name in os.listdir(self.path):
+            if name.startswith(prefix) and name.endswith(suffix) and name[len(prefix):-len(suffix)].isdigit():
+                generations.append(int(name[len(prefix):-len(suffix)]))
+        return sorted(generations)
+
+    def read_token(self, lease_path):
+        """The claim token in a lease file, or None if it is gone or not yet written."""
+        try:
+            with open(lease_path) as f:
+                return json.load(f).get("token")
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def is_done(self, unit):
+        return os.path.exists(self._done_path(unit))
+
+    def clear_done(self, unit):
+        """Drop a unit's done marker (e.g. its outputs were deleted) so it can be claimed again."""
+        try:
+            os.remove(self._done_path(unit))
+        except FileNotFoundError:
+            pass
+
+    def mark_done(self, unit):
+        done_path = self._done_path(unit)
+        temp_path = temp_output_path(done_path, self.owner)
+        with open(temp_path, "w") as f:
+            json.dump({"owner": self.owner, "finished": time.time()}, f)
+        os.replace(temp_path, done_path)
+
+    def try_claim(self, unit):
+        """
+        Claim a unit if it is not done and not held by a live lease.
+
+        Returns:
+            Lease: The held lease (release it, or complete() it when the unit's
+                outputs are in place), or None if the unit is unavailable.
+        """
+        if self.is_done(unit):
+            return None
+        while True:
+            generations = self.generations(unit)
+            generation = 0
+            if not generations:
+                break
+            try:
+                age = time.time() - os.stat(self._lease_path(unit, generations[-1])).st_mtime
+            except FileNotFoundError:
+                continue  # Released or reclaimed in the meantime; look again
+            if age < self.timeout:
+                return None
+            generation = generations[-1] + 1
+            print(f"Reclaiming expired lease on {unit} (no heartbeat for {age:.0f} seconds)")
+            break
+
+        path = self._lease_path(unit, generation)
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return None  # Another worker won this generation
+        token = uuid.uuid4().hex
+        with os.fdopen(fd, "w") as f:
+            json.dump({"owner": self.owner, "token": token, "claimed": time.time(), "generation": generation}, f)
+        # The unit may have finished, or been reclaimed past this generation,
+        # between the check above and the claim
+        if self.is_done(unit) or self.generations(unit)[-1] != generation:
+            os.remove(path)
+            return None
+        for old_generation in generations:
+            try:
+                os.remove(self._lease_path(unit, old_generation))
+            except FileNotFoundError:
+                pass
+        return Lease(self, unit, generation, token, self.heartbeat_interval)
@@ -0,0 +1,418 @@
+import wave
+from collections import deque
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import numpy as np
+from scipy.signal import lfilter
+
+# Samples generated per block (~1.5 s at 44.1 kHz); memory use is bounded by this
+DEFAULT_BLOCK_SIZE = 65536
+
+NOISE_COLORS = ("white", "pink", "brown", "blue", "violet")
+
+# White noise is scaled so that this many standard deviations reach full scale
+WHITE_NOISE_PEAK_SIGMA = 5.0
+
+# Brown noise: corner frequency of the leaky integrator (Hz) and output RMS level
+BROWN_NOISE_CORNER_HZ = 5.0
+BROWN_NOISE_RMS = 0.15
+
+# Spectrally shaped colors: power spectral density is proportional to f ** exponent
+SPECTRAL_EXPONENTS = {"pink": -1.0, "blue": 1.0, "violet": 2.0}
+SPECTRAL_FRAME_SIZE = 16384  # samples per shaped frame; frames overlap by half
+SHAPED_NOISE_RMS = 0.15
+
+
+@dataclass
+class NoiseSpec:
+    """
+    Description of a synthesized noise source, used instead of a WAV file.
+
+    color: One of NOISE_COLORS.
+    level: Gain applied on top of the color's default level.
+    seed: Seed for reproducible output (None draws fresh entropy).
+    """
+    color: str = "brown"
+    level: float = 1.0
+    seed: int = None
+
+    @classmethod
+    def parse(cls, text):
+        """Parse 'color[:level[:seed]]', e.g. 'brown', 'pink:0.5' or 'white:0.3:42'."""
+        parts = text.strip().lower().split(":")
+        if parts[0] not in NOISE_COLORS:
+            raise ValueError(f"Unknown noise color: {parts[0]}")
+        level = float(parts[1]) if len(parts) > 1 and parts[1] else 1.0
+        seed = int(parts[2]) if len(parts) > 2 and parts[2] else None
+        return cls(parts[0], level, seed)
+
+    def label(self, entropy=None):
+        """
+        File-name label, e.g. 'brown_noise_level0.3_seed1', distinct for every
+        color, level and seed. An unseeded spec is labelled with the entropy it
+        actually drew, if given, so that output can be reproduced.
+        """
+        seed = self.seed if self.seed is not None else entropy
+        label = f"{self.color}_noise_level{self.level:g}"
+        return label if seed is None else f"{label}_seed{seed}"
+
+
+def child_seed(root, index):
+    """
+    Return the index-th child of a SeedSequence.
+
+    Equivalent to `root.spawn(index + 1)[index]` on a fresh SeedSequence, but
+    does not materialize every earlier child, so very long timelines stay cheap.
+    """
+    return np.random.SeedSequence(root.entropy, spawn_key=root.spawn_key + (index,), pool_size=root.pool_size)
+
+
+def white_noise_block(seed_seq, n):
+    """Return n samples of float32 white (Gaussian) noise in the [-1, 1] range."""
+    block = np.random.default_rng(seed_seq).standard_normal(n, dtype=np.float32)
+    block *= np.float32(1.0 / WHITE_NOISE_PEAK_SIGMA)
+    np.clip(block, -1.0, 1.0, out=block)
+    return block
+
+
+class BrownNoiseGenerator:
+    """
+    Brown (red) noise from a leaky integrator of white noise.
+
+    The leak acts as a DC blocker below `corner_hz`, so the signal stays bounded
+    and its level is known up front; no global cumsum or max-normalization pass
+    is needed. Blocks are integrated from a zero state (which can happen in any
+    worker) and then continued from the previous block's last sample, which is a
+    cheap vectorized correction done in order.
+    """
+
+    def __init__(self, sample_rate=44100, corner_hz=BROWN_NOISE_CORNER_HZ, rms=BROWN_NOISE_RMS):
+        self.leak = float(np.exp(-2 * np.pi * corner_hz / sample_rate))
+        # Stationary RMS of y[n] = leak * y[n-1] + x[n] for unit-variance x
+        self.stationary_rms = 1.0 / np.sqrt(1 - self.leak ** 2)
+        self.gain = rms / self.stationary_rms
+        self._decay = np.zeros(0)
+
+    def initial_state(self, seed_seq):
+        """Draw a starting state from the stationary distribution (no fade-in from zero)."""
+        return float(np.random.default_rng(seed_seq).standard_normal() * self.stationary_rms)
+
+    def raw_block(self, seed_seq, n):
+        """Integrate n samples of unit white noise starting from a zero state."""
+        white = np.random.default_rng(seed_seq).standard_normal(n)
+        return lfilter([1.0], [1.0, -self.leak], white)
+
+    def continue_block(self, raw, state):
+        """
+        Continue a zero-state block from the previous integrator output.
+
+        Returns:
+            tuple: (float32 block scaled to the output level, new state)
+        """
+        n = len(raw)
+        if n == 0:
+            return raw.astype(np.float32), state
+        if len(self._decay) < n:
+            self._decay = self.leak ** np.arange(1, n + 1)
+        integrated = raw + self._decay[:n] * state
+        block = (integrated * self.gain).astype(np.float32)
+        np.clip(block, -1.0, 1.0, out=block)
+        return block, float(integrated[-1])
+
+
+@lru_cache(maxsize=None)
+def spectral_shape(exponent, frame_size=SPECTRAL_FRAME_SIZE):
+    """
+    Magnitude response (per rfft bin) that gives a power spectrum ~ f ** exponent,
+    normalized so unit-variance white noise comes out at unit variance.
+    """
+    bins = np.arange(frame_size // 2 + 1, dtype=np.float64)
+    magnitude = np.zeros_like(bins)
+    magnitude[1:] = bins[1:] ** (exponent / 2)
+    # Parseval: output variance is the mean of |H|^2 over the full (two-sided) spectrum
+    power = magnitude[0] ** 2 + 2 * np.sum(magnitude[1:-1] ** 2) + magnitude[-1] ** 2
+    return magnitude / np.sqrt(power / frame_size)
+
+
+@lru_cache(maxsize=None)
+def _overlap_window(frame_size):
+    # Sine window: w[n]^2 + w[n + frame_size/2]^2 == 1, so overlap-adding independent
+    # frames keeps the variance constant across the joins
+    return np.sin(np.pi * (np.arange(frame_size) + 0.5) / frame_size)
+
+
+def shaped_noise_block(color, root, block_index, block_size, frame_size=SPECTRAL_FRAME_SIZE):
+    """
+    Return block `block_index` of spectrally shaped noise (pink, blue or violet).
+
+    Each frame is white noise from its own child seed, shaped with a single
+    rfft/irfft, windowed and overlap-added at half the frame size. A block only
+    depends on the root seed and its index, so blocks can be rendered anywhere.
+    """
+    hop = frame_size // 2
+    if block_size % hop:
+        raise ValueError(f"block_size ({block_size}) must be a multiple of {hop} for {color} noise")
+    frames_per_block = block_size // hop
+    first_frame = block_index * frames_per_block
+    white = np.stack([
+        np.random.default_rng(child_seed(root, first_frame + i)).standard_normal(frame_size)
+        for i in range(frames_per_block + 1)
+    ])
+    spectrum = np.fft.rfft(white, axis=1) * spectral_shape(SPECTRAL_EXPONENTS[color], frame_size)
+    frames = np.fft.irfft(spectrum, n=frame_size, axis=1) * _overlap_window(frame_size)
+    # Output hop i is the tail of frame i plus the head of frame i + 1
+    block = (frames[:-1, hop:] + frames[1:, :hop]).reshape(-1) * SHAPED_NOISE_RMS
+    block = block.astype(np.float32)
+    np.clip(block, -1.0, 1.0, out=block)
+    return block
+
+
+def render_noise_block(color, root, block_index, block_size, sample_rate=44100):
+    """
+    Render one block of noise from the root SeedSequence and the block index only.
+
+    For brown noise this is the zero-state integration; noise_blocks() applies the
+    continuation in order.
+    """
+    if color == "white":
+        return white_noise_block(child_seed(root, block_index), block_size)
+    if color == "brown":
+        # Child 0 seeds the initial integrator state
+        return BrownNoiseGenerator(sample_rate).raw_block(child_seed(root, block_index + 1), block_size)
+    if color in SPECTRAL_EXPONENTS:
+        return shaped_noise_block(color, root, block_index, block_size)
+    raise ValueError(f"Unknown noise color: {color}")
+
+
+def _render_blocks(color, root, num_blocks, block_size, sample_rate, workers):
+    """Yield rendered blocks in order, using up to `workers` processes."""
+    if workers <= 1:
+        for index in range(num_blocks):
+            yield render_noise_block(color, root, index, block_size, sample_rate)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Keep a bounded number of blocks in flight so memory stays flat
+        pending = deque()
+        next_index = 0
+        while pending or next_index < num_blocks:
+            while next_index < num_blocks and len(pending) < 2 * workers:
+                pending.append(executor.submit(render_noise_block, color, root, next_index, block_size, sample_rate))
+                next_index += 1
+            yield pending.popleft().result()
+
+
+def noise_blocks(color, num_samples, sample_rate=44100, seed=None, workers=1, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Yield float32 blocks of noise in the [-1, 1] range.
+
+    The timeline is split into fixed blocks, each rendered from its own child of
+    SeedSequence(seed), and assembled in order. The same seed (and block_size)
+    gives bit-identical output whatever the number of workers.
+
+    Args:
+        color (str): One of NOISE_COLORS.
+        num_samples (int): Total number of samples to produce.
+        sample_rate (int): Sample rate in Hz.
+        seed (int or np.random.SeedSequence): Seed; None draws fresh entropy.
+        workers (int): Number of worker processes (1 renders in this process).
+        block_size (int): Samples per block.
+    """
+    if color not in NOISE_COLORS:
+        raise ValueError(f"Unknown noise color: {color}")
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    num_blocks = -(-num_samples // block_size)
+    brown = BrownNoiseGenerator(sample_rate) if color == "brown" else None
+    state = brown.initial_state(child_seed(root, 0)) if brown else None
+    blocks = _render_blocks(color, root, num_blocks, block_size, sample_rate, workers)
+    for index, block in enumerate(blocks):
+        block = block[:num_samples - index * block_size]
+        if brown:
+            block, state = brown.continue_block(block, state)
+        yield block
+
+
+def generate_noise(color, sample_rate, duration, seed=None, workers=1):
+    """Return `duration` seconds of noise as a single float32 array."""
+    num_samples = int(sample_rate * duration)
+    blocks = list(noise_blocks(color, num_samples, sample_rate, seed, workers))
+    return np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.float32)
+
+
+def generate_pink_noise(sample_rate, duration, seed=None, workers=1):
+    """Pink noise (-3 dB/octave)."""
+    return generate_noise("pink", sample_rate, duration, seed, workers)
+
+
+def generate_blue_noise(sample_rate, duration, seed=None, workers=1):
+    """Blue noise (+3 dB/octave)."""
+    return generate_noise("blue", sample_rate, duration, seed, workers)
+
+
+def generate_violet_noise(sample_rate, duration, seed=None, workers=1):
+    """Violet noise (+6 dB/octave)."""
+    return generate_noise("violet", sample_rate, duration, seed, workers)
+
+
+def loop_tile(signal, crossfade_samples, correlated=False):
+    """
+    Turn a signal of length L + crossfade_samples into a seamless loop of length L.
+
+    The extra tail (the natural continuation of the tile's last sample) is
+    crossfaded into the head, so playing the tile back to back has no click at
+    the join. The crossfade is equal-power (sin/cos gains): the head and the
+    tail are a whole tile apart, so they are uncorrelated, and the level stays
+    constant through the join. A linear crossfade would dip by 3 dB midway.
+
+    Args:
+        signal (np.ndarray): Source samples, longer than crossfade_samples.
+        crossfade_samples (int): Length of the crossfade.
+        correlated (bool): Remove the source's DC offset before the crossfade, for
+            strongly low-frequency signals such as brown noise, whose head and
+            tail can share an offset that an equal-power crossfade would raise.
+
+    Returns:
+        np.ndarray: The loop tile, same dtype as the input.
+    """
+    length = len(signal) - crossfade_samples
+    if crossfade_samples <= 0 or length < crossfade_samples:
+        raise ValueError("Signal must be at least twice the crossfade length")
+    fade_in, fade_out = crossfade_gains(crossfade_samples)
+    if signal.ndim > 1:
+        fade_in, fade_out = fade_in[:, None], fade_out[:, None]
+    source = signal.astype(np.float64)
+    if correlated:
+        # DC matching: center the source so the looped bed has no offset
+        source -= source.mean(axis=0)
+    tile = source[:length].copy()
+    tile[:crossfade_samples] = source[:crossfade_samples] * fade_in + source[length:] * fade_out
+    return np.clip(tile, -1.0, 1.0).astype(signal.dtype)
+
+
+def crossfade_gains(crossfade_samples):
+    """Equal-power (fade_in, fade_out) gains for joining two uncorrelated signals."""
+    ramp = (np.arange(crossfade_samples) + 0.5) / crossfade_samples
+    return np.sin(0.5 * np.pi * ramp), np.cos(0.5 * np.pi * ramp)
+
+
+def loop_tile_blocks(blocks, crossfade_samples, dc_offset=0.0):
+    """
+    Streaming loop_tile: the same loop, in constant memory.
+
+    The tile is emitted rotated by crossfade_samples: the body first, then the
+    crossfaded join (head faded in over the tail). A loop has no start, so this
+    repeats just as seamlessly, and only the head and the last crossfade_samples
+    of the stream are ever held.
+
+    Args:
+        blocks (iterable): Source blocks totalling L + crossfade_samples samples.
+        crossfade_samples (int): Length of the crossfade.
+        dc_offset (float): Subtracted from every sample before the crossfade; see
+            stream_loop_tile for how it is measured for correlated signals.
+
+    Yields:
+        np.ndarray: Blocks of the tile, same dtype as the input.
+    """
+    if crossfade_samples <= 0:
+        raise ValueError("Crossfade must be at least one sample")
+    fade_in, fade_out = crossfade_gains(crossfade_samples)
+
+    head_parts, head_length = [], 0
+    pending = None  # The most recent samples, held back until we know they are not the tail
+    dtype = None
+    for block in blocks:
+        block = np.asarray(block)
+        dtype = block.dtype
+        if head_length < crossfade_samples:
+            take = min(crossfade_samples - head_length, len(block))
+            head_parts.append(block[:take])
+            head_length += take
+            block = block[take:]
+            if not len(block):
+                continue
+        pending = block if pending is None else np.concatenate([pending, block])
+        if len(pending) > crossfade_samples:
+            body, pending = pending[:-crossfade_samples], pending[-crossfade_samples:]
+            yield np.clip(body.astype(np.float64) - dc_offset, -1.0, 1.0).astype(dtype)
+
+    if head_length < crossfade_samples or pending is None or len(pending) < crossfade_samples:
+        raise ValueError("Signal must be at least twice the crossfade length")
+    head = np.concatenate(head_parts)
+    if head.ndim > 1:
+        fade_in, fade_out = fade_in[:, None], fade_out[:, None]
+    join = (head - dc_offset) * fade_in + (pending - dc_offset) * fade_out
+    yield np.clip(join, -1.0, 1.0).astype(dtype)
+
+
+def stream_loop_tile(make_blocks, crossfade_samples, correlated=False):
+    """
+    Stream a loop tile (see loop_tile_blocks) from a reproducible block source.
+
+    For correlated signals the tile is DC-matched like loop_tile: a first
+    streaming pass measures the source's mean and the second pass subtracts it,
+    so memory stays constant for any duration.
+
+    Args:
+        make_blocks (callable): Returns a fresh iterable of the same source blocks
+            on every call (e.g. noise_blocks with a fixed SeedSequence).
+        crossfade_samples (int): Length of the crossfade.
+        correlated (bool): DC matching before the crossfade (brown noise).
+
+    Returns:
+        iterator: Blocks of the tile.
+    """
+    dc_offset = 0.0
+    if correlated:
+        total, count = 0.0, 0
+        for block in make_blocks():
+            total = total + np.asarray(block).sum(axis=0, dtype=np.float64)
+            count += len(block)
+        dc_offset = total / count
+    return loop_tile_blocks(make_blocks(), crossfade_samples, dc_offset)
+
+
+def make_loop_tile(color, sample_rate, tile_duration, crossfade=0.5, seed=None, workers=1):
+    """
+    Generate a short, click-free loop tile of the given noise color.
+
+    Args:
+        color (str): One of NOISE_COLORS.
+        sample_rate (int): Sample rate in Hz.
+        tile_duration (float): Length of the tile in seconds.
+        crossfade (float): Crossfade length in seconds.
+        seed (int or np.random.SeedSequence): Seed; None draws fresh entropy.
+        workers (int): Number of worker processes.
+
+    Returns:
+        np.ndarray: float32 tile of int(sample_rate * tile_duration) samples.
+    """
+    crossfade_samples = int(sample_rate * crossfade)
+    source = generate_noise(color, sample_rate, tile_duration + crossfade_samples / sample_rate, seed, workers)
+    return loop_tile(source, crossfade_samples, correlated=(color == "brown"))
+
+
+def write_wav_stream(output_file, blocks, sample_rate=44100, channels=1):
+    """
+    Write float blocks in [-1, 1] to a 16-bit PCM WAV file as they arrive.
+
+    Only one block is held in memory at a time, so the file can be any length.
+
+    Args:
+        output_file (str): Path of the WAV file to write.
+        blocks (iterable): Blocks shaped (n,) or (n, channels).
+        sample_rate (int): Sample rate in Hz.
+        channels (int): Number of channels in each block.
+
+    Returns:
+        int: Number of sample frames written.
+    """
+    frames_written = 0
+    with wave.open(output_file, "wb") as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        for block in blocks:
+            pcm = (np.clip(block, -1.0, 1.0) * 32767).astype("<i2")
+            wav_file.writeframes(pcm.tobytes())
+            frames_written += len(block)
+    return frames_written
@@ -0,0 +1,292 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from add_noise_to_video import add_generated_noise_to_video, add_noise_to_video
+from create_clips_from_txt import (DRAFT_FPS, DRAFT_HEIGHT, DRAFT_MAX_SECONDS, DRAFT_PRESET, DRAFT_WIDTH, WORDS_PER_CHUNK, chunk_text,
+                                   create_chapter_video, extract_text_and_chapters_from_text, log_run_details,
+                                   map_chapters_to_chunks)
+from get_chapters_from_txt import input_dir, replace_chapter_headings, toc
+from noise import NoiseSpec
+
+# Root directory of the content-addressed artifact cache
+CACHE_DIR = "cache"
+
+# Bump a stage's version whenever its implementation changes what it produces;
+# the version is part of every key, so stale artifacts are simply never hit again
+STAGE_VERSIONS = {"chapterize": 1, "render": 2, "mux": 1}
+
+def hash_file(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def hash_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def artifact_key(stage, inputs, params):
+    """
+    Key of a stage's artifact: a hash of the stage (and its version), the keys
+    or content hashes of its inputs, and its parameters.
+
+    Args:
+        stage (str): Stage name (a key of STAGE_VERSIONS).
+        inputs (list): Upstream artifact keys and/or content hashes.
+        params (dict): JSON-serializable parameters that affect the output.
+    """
+    payload = json.dumps({"stage": stage, "version": STAGE_VERSIONS[stage], "inputs": inputs, "params": params},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+@dataclass
+class Node:
+    """
+    One artifact in the dependency graph.
+
+    `build(dep_paths, tmp_dir)` produces the artifact inside tmp_dir from the
+    artifacts of `deps` and returns its path, or None on failure.
+    """
+    stage: str
+    key: str
+    suffix: str
+    build: Callable
+    deps: list = field(default_factory=list)
+    label: str = ""
+
+class ArtifactCache:
+    """
+    Artifacts stored under <root>/<stage>/<key[:2]>/<key><suffix>.
+
+    An artifact exists only once it is complete: stages build into a temporary
+    directory next to their final path and are moved into place with a rename.
+    """
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+        self.built = 0
+        self.hits = 0
+        self._realized = {}
+
+    def path(self, node):
+        return os.path.join(self.root, node.stage, node.key[:2], node.key + node.suffix)
+
+    def realize(self, node):
+        """
+        Return the path of a node's artifact, building it (and, first, any of its
+        dependencies) only if it is not already in the cache.
+
+        Returns:
+            str: Path to the artifact, or None if it or a dependency failed to build.
+        """
+        if node.key in self._realized:
+            return self._realized[node.key]
+        path = self.path(node)
+        if os.path.exists(path):
+            print(f"[cached] {node.stage} {node.label} ({node.key[:12]})")
+            self.hits += 1
+            self._realized[node.key] = path
+            return path
+
+        dep_paths = [self.realize(dep) for dep in node.deps]
+        if any(dep_path is None for dep_path in dep_paths):
+            print(f"[skipped] {node.stage} {node.label}: a dependency failed")
+            return None
+
+        print(f"[build] {node.stage} {node.label} ({node.key[:12]})")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(path))
+        try:
+            produced = node.build(dep_paths, tmp_dir)
+            if produced is None or not os.path.exists(produced):
+                print(f"Error: Stage {node.stage} failed for {node.label}")
+                return None
+            os.replace(produced, path)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.built += 1
+        self._realized[node.key] = path
+        return path
+
+# Place a cached artifact at a regular output path (hard link when possible)
+def export_artifact(path, output_path):
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    try:
+        os.link(path, output_path)
+    except OSError:
+        shutil.copy2(path, output_path)
+    return output_path
+
+# Stage 1: source text -> chaptered.txt
+def chapterize_node(input_file, table_of_contents=toc):
+    def build(dep_paths, tmp_dir):
+        with open(input_file, "r", encoding="utf-8") as f:
+            text = f.read()
+        output_file = os.path.join(tmp_dir, "chaptered.txt")
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(replace_chapter_headings(text, table_of_contents))
+        return output_file
+
+    key = artifact_key("chapterize", [hash_file(input_file)], {"toc": table_of_contents})
+    return Node("chapterize", key, ".txt", build, label=os.path.basename(input_file))
+
+# Stage 2: chaptered.txt -> one MP4 per chapter, keyed by that chapter's own text
+def render_nodes(chaptered_node, chaptered_path, base_filename, book_title, author, render_params):
+    book_text, chapter_positions, chapter_titles = extract_text_and_chapters_from_text(chaptered_path)
+    if book_text is None or chapter_positions is None:
+        return None
+    words_per_chunk = render_params["words_per_chunk"]
+    chunks = chunk_text(book_text, words_per_chunk)
+    chapter_indices = map_chapters_to_chunks(chapter_positions, chunks, words_per_chunk)
+    if not chapter_indices:
+        print("No chapters detected. Treating as single section.")
+        chapter_indices = [0]
+        chapter_positions = [("1", 0)]
+        chapter_titles = ["Start"]
+
+    params = dict(render_params, title=book_title, author=author)
+    nodes = []
+    for i, chapter_idx in enumerate(chapter_indices):
+        next_chapter_idx = chapter_indices[i + 1] if i + 1 < len(chapter_indices) else None
+        chapter_num, chapter_title = chapter_positions[i][0], chapter_titles[i]
+
+        def build(dep_paths, tmp_dir, chapter_idx=chapter_idx, next_chapter_idx=next_chapter_idx,
+                  chapter_num=chapter_num, chapter_title=chapter_title):
+            output_path = os.path.join(tmp_dir, f"{base_filename}-{chapter_num}.mp4")
+            created = create_chapter_video(book_title, author, chunks, chapter_idx, next_chapter_idx, chapter_title, chapter_num,
+                                           output_path, **render_params)
+            return output_path if created else None
+
+        # Only this chapter's words and title go into the key, so editing one
+        # chapter re-renders just that chapter
+        chapter_text = "\n".join(chunks[chapter_idx:next_chapter_idx])
+        key = artifact_key("render", [hash_text(chapter_title), hash_text(chapter_text)], params)
+        nodes.append((chapter_num, Node("render", key, ".mp4", build, deps=[chaptered_node],
+                                        label=f"{base_filename} chapter {chapter_num}")))
+    return nodes
+
+# Stage 3: chapter MP4 + noise (a NoiseSpec or an audio file) -> muxed MP4
+def mux_node(render_node, noise, sample_rate=44100, workers=1):
+    if isinstance(noise, NoiseSpec):
+        def build(dep_paths, tmp_dir):
+            return add_generated_noise_to_video(dep_paths[0], noise, tmp_dir, sample_rate=sample_rate, workers=workers)
+        # An unseeded spec is cached like any other: the first random draw is reused
+        params = {"color": noise.color, "level": noise.level, "seed": noise.seed, "sample_rate": sample_rate}
+        key = artifact_key("mux", [render_node.key], params)
+        label = noise.label()
+    else:
+        def build(dep_paths, tmp_dir):
+            return add_noise_to_video(dep_paths[0], noise, tmp_dir)
+        # add_noise_to_video picks its volume from the file name, so that is a parameter too
+        key = artifact_key("mux", [render_node.key, hash_file(noise)], {"audio_name": os.path.basename(noise).lower()})
+        label = os.path.splitext(os.path.basename(noise))[0]
+    return Node("mux", key, ".mp4", build, deps=[render_node], label=f"{render_node.label} + {label}"), label
+
+def build_book(input_file, book_title, author, noises=(), draft=False, chunk_stride=1, max_seconds=None,
+               cache_dir=CACHE_DIR, output_dir="videos_with_audio", workers=1, words_per_chunk=WORDS_PER_CHUNK):
+    """
+    Build every chapter of a book through chapterize -> render -> mux, running
+    only the stages whose inputs or parameters changed since a previous build.
+
+    Args:
+        input_file (str): Source text file (e.g. input-txts/test.txt).
+        book_title (str): Book title shown on the title frames.
+        author (str): Author shown on the title frames.
+        noises (list): NoiseSpecs and/or audio file paths to mux onto each chapter.
+            With none, the chapter videos themselves are the outputs.
+        draft (bool): Render fast previews (see create_clips_from_txt.render_book).
+        chunk_stride (int): Show only every K-th chunk of each chapter.
+        max_seconds (float): Cut each chapter after this many seconds.
+        cache_dir (str): Root of the artifact cache.
+        output_dir (str): Where muxed outputs are placed, under a per-book directory.
+        workers (int): Worker processes for noise synthesis.
+        words_per_chunk (int): Words shown on each frame.
+
+    Returns:
+        list: Paths of the final outputs, or None if the text could not be processed.
+    """
+    if not os.path.exists(input_file):
+        print(f"Error: Input file '{input_file}' not found.")
+        return None
+    base_filename = os.path.splitext(os.path.basename(input_file))[0]
+    cache = ArtifactCache(cache_dir)
+
+    chaptered_node = chapterize_node(input_file)
+    chaptered_path = cache.realize(chaptered_node)
+    if chaptered_path is None:
+        return None
+    export_artifact(chaptered_path, os.path.join("txts", base_filename, "chaptered.txt"))
+
+    if draft:
+        render_params = dict(width=DRAFT_WIDTH, height=DRAFT_HEIGHT, fps=DRAFT_FPS, preset=DRAFT_PRESET)
+    else:
+        render_params = dict(width=640, height=360, fps=24, preset="medium")
+    render_params.update(wpm=450, chunk_stride=chunk_stride, max_seconds=max_seconds, words_per_chunk=words_per_chunk)
+    chapters = render_nodes(chaptered_node, chaptered_path, base_filename, book_title, author, render_params)
+    if chapters is None:
+        return None
+
+    outputs = []
+    for chapter_num, render_node in chapters:
+        if not noises:
+            path = cache.realize(render_node)
+            if path:
+                subdir = "drafts" if draft else "chapters"
+                outputs.append(export_artifact(path, os.path.join("videos", base_filename, subdir, f"{base_filename}-{chapter_num}.mp4")))
+            continue
+        for noise in noises:
+            node, label = mux_node(render_node, noise, workers=workers)
+            path = cache.realize(node)
+            if path:
+                outputs.append(export_artifact(path, os.path.join(output_dir, base_filename, f"{base_filename}-{chapter_num}_{label}.mp4")))
+
+    print(f"Stages built: {cache.built}, reused from cache: {cache.hits}")
+    return outputs
+
+# Command-line options; title and author are prompted for if not given
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build a book's chapter videos, re-running only the stages whose inputs changed.")
+    parser.add_argument("--text-file", required=True, help=f"Name of the source text file in {input_dir}/ (e.g., 'test')")
+    parser.add_argument("--title", help="Book title")
+    parser.add_argument("--author", help="Author name")
+    parser.add_argument("--noise", action="append", type=NoiseSpec.parse, default=[],
+                        help="Noise to synthesize and mux, 'color[:level[:seed]]' (repeatable)")
+    parser.add_argument("--audio", action="append", default=[], help="Audio file to loop under each chapter (repeatable)")
+    parser.add_argument("--draft", action="store_true", help="Render fast previews")
+    parser.add_argument("--draft-seconds", type=float, help=f"Seconds of each chapter to render (default {DRAFT_MAX_SECONDS} with --draft)")
+    parser.add_argument("--draft-stride", type=int, default=1, help="Render only every K-th chunk of each chapter")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Artifact cache directory")
+    parser.add_argument("--words-per-chunk", type=int, default=WORDS_PER_CHUNK, help="Words shown on each frame")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    start_time = time.time()
+    args = parse_args()
+    text_filename = args.text_file if args.text_file.lower().endswith(".txt") else args.text_file + ".txt"
+    book_title = args.title if args.title is not None else input("Enter the book title: ").strip()
+    author = args.author if args.author is not None else input("Enter the author name: ").strip()
+
+    draft = args.draft or args.draft_stride > 1 or bool(args.draft_seconds)
+    max_seconds = args.draft_seconds
+    if max_seconds is None and args.draft and args.draft_stride == 1:
+        max_seconds = DRAFT_MAX_SECONDS
+    outputs = build_book(os.path.join(input_dir, text_filename), book_title, author, args.noise + args.audio,
+                         draft=draft, chunk_stride=args.draft_stride, max_seconds=max_seconds or None,
+                         cache_dir=args.cache_dir, workers=os.cpu_count() or 1, words_per_chunk=args.words_per_chunk)
+    if outputs is None:
+        print("Failed to process text file. Exiting.")
+        exit(1)
+    print(f"Created {len(outputs)} outputs")
+
+    execution_time = time.time() - start_time
+    minutes, seconds = divmod(int(execution_time), 60)
+    print(f"Total execution time: {minutes:02d}:{seconds:02d} (minutes:seconds)")
+    log_run_details(os.path.basename(__file__), book_title, execution_time)
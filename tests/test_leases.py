@@ -0,0 +1,66 @@
+import os
+
+from leases import LeaseDirectory
+
+TIMEOUT = 60
+
+
+def lease_directory(path, owner):
+    # A long heartbeat interval keeps the background threads out of the way
+    return LeaseDirectory(str(path), timeout=TIMEOUT, heartbeat_interval=3600, owner=owner)
+
+
+def expire(lease):
+    """Age a lease's file past the timeout, as if its worker had stalled."""
+    old = os.stat(lease.path).st_mtime - 2 * TIMEOUT
+    os.utime(lease.path, (old, old))
+
+
+def test_live_lease_blocks_other_workers(tmp_path):
+    a, b = lease_directory(tmp_path, "a"), lease_directory(tmp_path, "b")
+    lease = a.try_claim("unit")
+    assert lease is not None
+    assert b.try_claim("unit") is None
+    lease.release()
+
+
+def test_released_unit_is_claimed_again_from_generation_zero(tmp_path):
+    a, b = lease_directory(tmp_path, "a"), lease_directory(tmp_path, "b")
+    a.try_claim("unit").release()
+    lease = b.try_claim("unit")
+    assert lease.generation == 0
+    lease.release()
+
+
+def test_reclaimed_worker_cannot_complete(tmp_path):
+    a, b = lease_directory(tmp_path, "a"), lease_directory(tmp_path, "b")
+    stale = a.try_claim("unit")
+    expire(stale)
+    fresh = b.try_claim("unit")
+    assert fresh.generation == 1
+    assert not stale.held()
+    assert not stale.complete()
+    assert not a.is_done("unit")
+    assert fresh.complete()
+    assert a.is_done("unit")
+
+
+def test_stale_worker_does_not_take_a_reused_generation(tmp_path):
+    a, b, c = (lease_directory(tmp_path, owner) for owner in "abc")
+    stale = a.try_claim("unit")
+    expire(stale)
+    # b reclaims the unit, then gives it up, which removes every lease file...
+    b.try_claim("unit").release()
+    # ...so the next claim reuses generation 0, the stale worker's path
+    current = c.try_claim("unit")
+    assert current.generation == stale.generation == 0
+    assert current.path == stale.path
+
+    assert not stale.held()
+    assert not stale.complete()
+    assert not a.is_done("unit")
+    # Releasing the stale lease must not delete the current holder's file
+    stale.release()
+    assert os.path.exists(current.path)
+    assert current.held()
+    assert current.complete()
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from noise import loop_tile, make_loop_tile, noise_blocks, stream_loop_tile
+
+SAMPLE_RATE = 44100
+CROSSFADE = 0.5
+
+
+def crossfade_level_db(color, seeds=range(100), tile_duration=1.0):
+    """Mean power of the crossfaded join relative to the rest of the tile, in dB."""
+    crossfade_samples = int(SAMPLE_RATE * CROSSFADE)
+    join_power, body_power = [], []
+    for seed in seeds:
+        tile = make_loop_tile(color, SAMPLE_RATE, tile_duration, CROSSFADE, seed).astype(np.float64)
+        join_power.append(np.mean(tile[:crossfade_samples] ** 2))
+        body_power.append(np.mean(tile[crossfade_samples:] ** 2))
+    return 10 * np.log10(np.mean(join_power) / np.mean(body_power))
+
+
+@pytest.mark.parametrize("color", ["brown", "white", "pink"])
+def test_crossfade_keeps_level(color):
+    assert abs(crossfade_level_db(color)) < 0.5
+
+
+@pytest.mark.parametrize("color", ["brown", "white"])
+def test_streamed_tile_matches_loop_tile(color):
+    crossfade_samples = int(SAMPLE_RATE * CROSSFADE)
+    num_samples = 2 * SAMPLE_RATE + crossfade_samples
+    correlated = color == "brown"
+    source = np.concatenate(list(noise_blocks(color, num_samples, SAMPLE_RATE, 7)))
+    streamed = np.concatenate(list(stream_loop_tile(
+        lambda: noise_blocks(color, num_samples, SAMPLE_RATE, 7), crossfade_samples, correlated)))
+    # The streamed tile is rotated: body first, then the join
+    expected = np.roll(loop_tile(source, crossfade_samples, correlated), -crossfade_samples)
+    np.testing.assert_allclose(streamed, expected, atol=1e-6)